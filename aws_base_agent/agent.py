@@ -5,22 +5,46 @@ Uses BedrockAgentCoreApp wrapper for compatibility with agentcore CLI.
 """
 
 import os
-import json
+import re
+import time
+import asyncio
 import logging
-from typing import AsyncGenerator, Optional
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import AsyncGenerator, Mapping, Optional
 
+import boto3
+import orjson
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from langchain_aws import ChatBedrock, AmazonKnowledgeBasesRetriever
+from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Only when run as a program (including `python -m`, as the Dockerfile does);
+# when imported, the importing application owns the logging configuration.
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger(__name__)
 
+# Use uvloop for the event loops that serve requests when it is installed.
+# BedrockAgentCoreApp creates its handler loop with asyncio.new_event_loop(),
+# which follows the installed policy; uvicorn picks uvloop up on its own.
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 # Configuration
 REGION = "us-east-1"
 MODEL_ID = "us.anthropic.claude-sonnet-4-5-20250929-v1:0"
@@ -45,11 +69,88 @@ GUARDRAIL_VERSION = os.getenv("BEDROCK_GUARDRAIL_VERSION", "DRAFT")
 # 4. Set BEDROCK_KNOWLEDGE_BASE_ID environment variable to your Knowledge Base ID
 KNOWLEDGE_BASE_ID = os.getenv("BEDROCK_KNOWLEDGE_BASE_ID", "")
 
+# Optional second Knowledge Base (e.g. one indexed with a different chunking or
+# keyword-oriented data source). When set, both are queried in parallel and the
+# merged, de-duplicated hits are returned, so retrieval costs max(sources) not sum.
+SECONDARY_KNOWLEDGE_BASE_ID = os.getenv("BEDROCK_SECONDARY_KNOWLEDGE_BASE_ID", "")
+
+# Per-source timeout in seconds so one slow Knowledge Base can't stall the others
+KB_SOURCE_TIMEOUT = float(os.getenv("BEDROCK_KB_SOURCE_TIMEOUT", "10"))
+
+# Identical questions are common, so formatted KB results are cached in-process.
+# Only results from every configured source are cached; partial results (one
+# source failed or timed out) are returned but not kept, so a transient failure
+# doesn't pin an incomplete answer for the whole TTL.
+# BEDROCK_KB_CACHE_TTL is in seconds; set it to 0 to disable the cache.
+KB_CACHE_TTL = float(os.getenv("BEDROCK_KB_CACHE_TTL", "3600"))
+KB_CACHE_MAXSIZE = 1024
+
+# Upper bound on Retrieve calls in flight from this worker at once. Bursts of
+# concurrent sessions queue here instead of tripping Bedrock throttling.
+KB_MAX_CONCURRENCY = int(os.getenv("BEDROCK_KB_MAX_CONCURRENCY", "8"))
+
+# ChatBedrock streams through boto3's blocking event stream, which LangChain drives
+# from the event loop's default executor, so every in-flight response holds one of
+# its threads. asyncio's default of min(32, cpu + 4) workers would cap concurrent
+# streams per worker; the handler loop gets a pool (and HTTP pool) of this size.
+LLM_MAX_CONCURRENCY = int(os.getenv("BEDROCK_LLM_MAX_CONCURRENCY", "64"))
+
+# Issue a throwaway retrieval at startup so the first user query doesn't pay for
+# endpoint discovery and the TLS handshake. Set BEDROCK_PREWARM=1 to enable it
+# (default: off, matching the local agents).
+PREWARM = os.getenv("BEDROCK_PREWARM", "0").lower() in ("1", "true", "yes")
+
+# Pre-serialized error bodies streamed back by handle_request
+ERROR_NO_PROMPT = orjson.dumps({"error": "No prompt provided"}).decode()
+ERROR_GENERIC = orjson.dumps({"error": "An error occurred processing your request"}).decode()
+
+# Keywords in a Bedrock error message that indicate a GuardRails intervention,
+# matched case-insensitively in a single pass
+GUARDRAIL_ERROR_PATTERN = re.compile(r"guardrail|intervention|blocked", re.IGNORECASE)
+
+# create_react_agent names its model node "agent"; only that node's output is streamed
+AGENT_NODE = "agent"
+
+# Streamed text is coalesced into frames before yielding: a frame goes out once it
+# holds STREAM_FRAME_CHARS characters or STREAM_FRAME_INTERVAL seconds have passed
+# since the last one. The first token of a response is never held back because the
+# model's time-to-first-token already exceeds the interval. Pending text is also
+# sent as soon as the model starts a tool call, so text preceding it is not held
+# while the tool runs.
+STREAM_FRAME_CHARS = 128
+STREAM_FRAME_INTERVAL = 0.05
+
 SYSTEM_PROMPT = """You are a helpful assistant deployed on AWS Bedrock AgentCore.
 You can answer questions and use tools to help users.
 Be concise and helpful in your responses."""
 
 
+class _TTLCache:
+    """Bounded LRU mapping whose entries expire after a fixed number of seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
 # Define tools
 @tool
 def get_weather(location: str) -> str:
@@ -57,6 +158,109 @@ def get_weather(location: str) -> str:
     return f"The weather in {location} is 72°F and sunny."
 
 
+# Knowledge Base error formatters
+# Each turns a failed Retrieve call into guidance for the user and logs the details.
+# They are dispatched by ClientError code through _KB_ERROR_HANDLERS below.
+
+def _fmt_kb_not_found(query: str, error: Exception) -> str:
+    # ResourceNotFoundException: Knowledge Base ID doesn't exist or is inaccessible
+    # This usually means:
+    # 1. The Knowledge Base ID is incorrect or misspelled
+    # 2. The Knowledge Base was deleted
+    # 3. The Knowledge Base is in a different region
+    # 4. IAM permissions don't allow access to this Knowledge Base
+    logger.error(
+        "Knowledge Base not found. ID: %s, Region: %s, Query: %.50s...",
+        KNOWLEDGE_BASE_ID, REGION, query,
+    )
+    return (
+        f"Knowledge Base not found (ID: {KNOWLEDGE_BASE_ID}).\n"
+        "Please verify:\n"
+        "1. The Knowledge Base ID is correct in BEDROCK_KNOWLEDGE_BASE_ID\n"
+        "2. The Knowledge Base exists in the AWS Bedrock Console\n"
+        f"3. The Knowledge Base is in the {REGION} region\n"
+        "4. Your IAM permissions allow access to this Knowledge Base"
+    )
+
+
+def _fmt_kb_validation(query: str, error: Exception) -> str:
+    # ValidationException: Query format or parameters are invalid
+    # This usually means:
+    # 1. The query string is empty or malformed
+    # 2. The retrieval configuration has invalid parameters
+    # 3. The query exceeds maximum length limits
+    logger.error(
+        "Knowledge Base query validation failed. ID: %s, Query: %.50s..., Error: %s",
+        KNOWLEDGE_BASE_ID, query, error,
+    )
+    return (
+        f"Invalid query format: {str(error)}\n"
+        "Please ensure:\n"
+        "1. The query is not empty and contains valid text\n"
+        "2. The query is not too long (max ~1000 characters)\n"
+        "3. The query doesn't contain special characters that need escaping"
+    )
+
+
+def _fmt_kb_access_denied(query: str, error: Exception) -> str:
+    # AccessDeniedException: IAM permissions are insufficient
+    logger.error(
+        "Access denied to Knowledge Base. ID: %s, Region: %s",
+        KNOWLEDGE_BASE_ID, REGION,
+    )
+    return (
+        "Access denied to Knowledge Base.\n"
+        "Please verify your IAM permissions include:\n"
+        "- bedrock:Retrieve on the Knowledge Base resource\n"
+        "- bedrock:InvokeModel for the embedding model"
+    )
+
+
+def _fmt_kb_throttling(query: str, error: Exception) -> str:
+    # ThrottlingException: Too many requests to Bedrock API
+    logger.warning(
+        "Knowledge Base query throttled. ID: %s, Query: %.50s...",
+        KNOWLEDGE_BASE_ID, query,
+    )
+    return (
+        "Knowledge Base query was throttled due to rate limits.\n"
+        "Please try again in a moment."
+    )
+
+
+def _fmt_kb_service_error(error_code: str, error: Exception) -> str:
+    # Other AWS service errors
+    logger.error(
+        "Knowledge Base AWS service error. Code: %s, ID: %s, Error: %s",
+        error_code, KNOWLEDGE_BASE_ID, error,
+    )
+    return (
+        f"Knowledge Base service error: {error_code}\n"
+        f"Details: {str(error)}"
+    )
+
+
+def _fmt_kb_unexpected_error(query: str, error: Exception) -> str:
+    # General exceptions (network errors, timeouts, unexpected errors)
+    logger.error(
+        "Unexpected Knowledge Base error. ID: %s, Query: %.50s..., Error: %s",
+        KNOWLEDGE_BASE_ID, query, error,
+    )
+    return (
+        "An unexpected error occurred while searching the knowledge base.\n"
+        f"Error: {str(error)}\n"
+        "Please check your network connection and AWS credentials."
+    )
+
+
+_KB_ERROR_HANDLERS = {
+    "ResourceNotFoundException": _fmt_kb_not_found,
+    "ValidationException": _fmt_kb_validation,
+    "AccessDeniedException": _fmt_kb_access_denied,
+    "ThrottlingException": _fmt_kb_throttling,
+}
+
+
 def create_knowledge_base_tool():
     """
     Create a Knowledge Base query tool if Knowledge Base is configured.
@@ -78,10 +282,136 @@ def create_knowledge_base_tool():
         logger.info("Knowledge Base: disabled (no BEDROCK_KNOWLEDGE_BASE_ID configured)")
         return None
     
-    logger.info(f"Knowledge Base: enabled (ID: {KNOWLEDGE_BASE_ID})")
+    logger.info("Knowledge Base: enabled (ID: %s)", KNOWLEDGE_BASE_ID)
+
+    kb_ids = [KNOWLEDGE_BASE_ID]
+    if SECONDARY_KNOWLEDGE_BASE_ID:
+        logger.info("Knowledge Base: secondary source enabled (ID: %s)", SECONDARY_KNOWLEDGE_BASE_ID)
+        kb_ids.append(SECONDARY_KNOWLEDGE_BASE_ID)
+
+    # One pooled bedrock-agent-runtime client shared by every retriever, so the
+    # TLS connections to the Retrieve endpoint stay warm across tool calls
+    kb_client = boto3.Session().client(
+        "bedrock-agent-runtime",
+        region_name=REGION,
+        config=Config(
+            max_pool_connections=50,
+            retries={"max_attempts": 2, "mode": "standard"},
+        ),
+    )
+
+    # Initialize the Knowledge Base retrievers once rather than on every tool call
+    # AmazonKnowledgeBasesRetriever handles the vector search and document retrieval
+    retrievers = {
+        kb_id: AmazonKnowledgeBasesRetriever(
+            knowledge_base_id=kb_id,
+            client=kb_client,
+            # Retrieval configuration controls how documents are searched and ranked
+            retrieval_config={
+                "vectorSearchConfiguration": {
+                    # numberOfResults: How many top documents to retrieve (default: 5)
+                    # Higher values return more context but may include less relevant results
+                    "numberOfResults": 5
+                }
+            }
+        )
+        for kb_id in kb_ids
+    }
+
+    if PREWARM:
+        def _warmup() -> None:
+            for kb_id, retriever in retrievers.items():
+                try:
+                    retriever.invoke("warmup")
+                    logger.info("Knowledge Base: warmed up (ID: %s)", kb_id)
+                except Exception as e:
+                    logger.debug("Knowledge Base warm-up failed (ID: %s): %s", kb_id, e)
+
+        # Runs in the background so it never delays the app from accepting requests
+        threading.Thread(target=_warmup, name="kb-warmup", daemon=True).start()
+
+    retrieve_slots = asyncio.Semaphore(KB_MAX_CONCURRENCY)
+    in_flight: dict = {}
+
+    # boto3 is synchronous, so Retrieve calls run on worker threads. They get a
+    # dedicated pool sized to the concurrency cap instead of the loop's default
+    # executor, which is small on AgentCore's containers and is also where
+    # ChatBedrock streams model output from.
+    kb_executor = ThreadPoolExecutor(
+        max_workers=KB_MAX_CONCURRENCY, thread_name_prefix="kb-retrieve"
+    )
+
+    async def _retrieve_kb(kb_id: str, query: str) -> list:
+        """Query a single Knowledge Base, bounded by KB_SOURCE_TIMEOUT."""
+        retriever = retrievers[kb_id]
+
+        # Retrieve relevant documents using semantic similarity search
+        # The query is converted to an embedding and matched against document embeddings.
+        # Running it off-loop keeps the event loop free while the Retrieve call is in
+        # flight, so concurrent sessions on this worker don't serialize behind KB latency.
+        # The caller's context is carried over so tracing spans stay attached.
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        async with retrieve_slots:
+            return await asyncio.wait_for(
+                loop.run_in_executor(kb_executor, ctx.run, retriever.invoke, query),
+                KB_SOURCE_TIMEOUT,
+            )
+
+    result_cache = _TTLCache(KB_CACHE_MAXSIZE, KB_CACHE_TTL) if KB_CACHE_TTL > 0 else None
+
+    async def _retrieve_all(query: str) -> tuple[list, bool]:
+        """
+        Fan out to every configured Knowledge Base and merge the hits.
+        
+        Returns:
+            tuple: (merged documents, whether every source succeeded)
+        """
+        outcomes = await asyncio.gather(
+            *(_retrieve_kb(kb_id, query) for kb_id in kb_ids),
+            return_exceptions=True,
+        )
+
+        failures = [o for o in outcomes if isinstance(o, BaseException)]
+        if len(failures) == len(outcomes):
+            # Every source failed - surface the primary error to the handler below
+            raise failures[0]
+        for kb_id, outcome in zip(kb_ids, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning(
+                    "Knowledge Base source failed, using remaining results. ID: %s, Error: %r",
+                    kb_id, outcome,
+                )
+
+        # Merge in source order, dropping documents already returned by another source
+        seen = set()
+        merged = []
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                continue
+            for doc in outcome:
+                if doc.page_content not in seen:
+                    seen.add(doc.page_content)
+                    merged.append(doc)
+        return merged, not failures
+
+    async def _retrieve_coalesced(query: str) -> tuple[list, bool]:
+        """
+        Share one in-flight retrieval between concurrent identical queries.
+        
+        Sessions that ask the same question while a Retrieve for it is still
+        running await that call instead of issuing their own. The shared task is
+        shielded so one caller being cancelled doesn't cancel it for the others.
+        """
+        task = in_flight.get(query)
+        if task is None:
+            task = asyncio.ensure_future(_retrieve_all(query))
+            in_flight[query] = task
+            task.add_done_callback(lambda _: in_flight.pop(query, None))
+        return await asyncio.shield(task)
     
     @tool
-    def query_knowledge_base(query: str) -> str:
+    async def query_knowledge_base(query: str) -> str:
         """
         Search the knowledge base for relevant information using RAG.
         
@@ -95,133 +425,45 @@ def create_knowledge_base_tool():
         Returns:
             Formatted results from the knowledge base with document content
         """
+        # Cache key: the question with case and surrounding whitespace normalized,
+        # scoped to the configured Knowledge Base(s)
+        cache_key = (tuple(kb_ids), query.strip().lower())
+        if result_cache is not None:
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            # Initialize the Knowledge Base retriever
-            # AmazonKnowledgeBasesRetriever handles the vector search and document retrieval
-            retriever = AmazonKnowledgeBasesRetriever(
-                knowledge_base_id=KNOWLEDGE_BASE_ID,
-                region_name=REGION,
-                # Retrieval configuration controls how documents are searched and ranked
-                retrieval_config={
-                    "vectorSearchConfiguration": {
-                        # numberOfResults: How many top documents to retrieve (default: 5)
-                        # Higher values return more context but may include less relevant results
-                        "numberOfResults": 5
-                    }
-                }
-            )
-            
-            # Retrieve relevant documents using semantic similarity search
-            # The query is converted to an embedding and matched against document embeddings
-            results = retriever.get_relevant_documents(query)
+            results, complete = await _retrieve_coalesced(query)
             
             if not results:
                 return "No relevant information found in the knowledge base."
             
-            # Format results for the agent
+            # Format results for the agent in a single join
             # Each result includes the document content and optional metadata
-            formatted = []
-            for i, doc in enumerate(results, 1):
-                formatted.append(f"Result {i}:\n{doc.page_content}\n")
-            
-            return "\n".join(formatted)
+            response = "\n".join(
+                f"Result {i}:\n{doc.page_content}\n" for i, doc in enumerate(results, 1)
+            )
+            if result_cache is not None and complete:
+                result_cache.set(cache_key, response)
+            return response
         
         # Enhanced Error Handling for Knowledge Base Operations
         # AWS Bedrock Knowledge Base can fail for various reasons - we handle each
         # specifically to provide helpful guidance to users on how to fix issues.
         
         except Exception as e:
-            # Import boto3 exceptions for specific error handling
-            from botocore.exceptions import ClientError
-            
             # Check if this is an AWS service error with specific error codes
+            # and dispatch to the matching formatter with a single lookup
             if isinstance(e, ClientError):
                 error_code = e.response['Error']['Code']
-                
-                # ResourceNotFoundException: Knowledge Base ID doesn't exist or is inaccessible
-                # This usually means:
-                # 1. The Knowledge Base ID is incorrect or misspelled
-                # 2. The Knowledge Base was deleted
-                # 3. The Knowledge Base is in a different region
-                # 4. IAM permissions don't allow access to this Knowledge Base
-                if error_code == 'ResourceNotFoundException':
-                    logger.error(
-                        f"Knowledge Base not found. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Region: {REGION}, Query: {query[:50]}..."
-                    )
-                    return (
-                        f"Knowledge Base not found (ID: {KNOWLEDGE_BASE_ID}).\n"
-                        "Please verify:\n"
-                        "1. The Knowledge Base ID is correct in BEDROCK_KNOWLEDGE_BASE_ID\n"
-                        "2. The Knowledge Base exists in the AWS Bedrock Console\n"
-                        f"3. The Knowledge Base is in the {REGION} region\n"
-                        "4. Your IAM permissions allow access to this Knowledge Base"
-                    )
-                
-                # ValidationException: Query format or parameters are invalid
-                # This usually means:
-                # 1. The query string is empty or malformed
-                # 2. The retrieval configuration has invalid parameters
-                # 3. The query exceeds maximum length limits
-                elif error_code == 'ValidationException':
-                    logger.error(
-                        f"Knowledge Base query validation failed. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Query: {query[:50]}..., Error: {str(e)}"
-                    )
-                    return (
-                        f"Invalid query format: {str(e)}\n"
-                        "Please ensure:\n"
-                        "1. The query is not empty and contains valid text\n"
-                        "2. The query is not too long (max ~1000 characters)\n"
-                        "3. The query doesn't contain special characters that need escaping"
-                    )
-                
-                # AccessDeniedException: IAM permissions are insufficient
-                elif error_code == 'AccessDeniedException':
-                    logger.error(
-                        f"Access denied to Knowledge Base. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Region: {REGION}"
-                    )
-                    return (
-                        "Access denied to Knowledge Base.\n"
-                        "Please verify your IAM permissions include:\n"
-                        "- bedrock:Retrieve on the Knowledge Base resource\n"
-                        "- bedrock:InvokeModel for the embedding model"
-                    )
-                
-                # ThrottlingException: Too many requests to Bedrock API
-                elif error_code == 'ThrottlingException':
-                    logger.warning(
-                        f"Knowledge Base query throttled. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Query: {query[:50]}..."
-                    )
-                    return (
-                        "Knowledge Base query was throttled due to rate limits.\n"
-                        "Please try again in a moment."
-                    )
-                
-                # Other AWS service errors
-                else:
-                    logger.error(
-                        f"Knowledge Base AWS service error. "
-                        f"Code: {error_code}, ID: {KNOWLEDGE_BASE_ID}, Error: {str(e)}"
-                    )
-                    return (
-                        f"Knowledge Base service error: {error_code}\n"
-                        f"Details: {str(e)}"
-                    )
+                handler = _KB_ERROR_HANDLERS.get(error_code)
+                if handler is not None:
+                    return handler(query, e)
+                return _fmt_kb_service_error(error_code, e)
             
             # General exceptions (network errors, timeouts, unexpected errors)
-            else:
-                logger.error(
-                    f"Unexpected Knowledge Base error. "
-                    f"ID: {KNOWLEDGE_BASE_ID}, Query: {query[:50]}..., Error: {str(e)}"
-                )
-                return (
-                    "An unexpected error occurred while searching the knowledge base.\n"
-                    f"Error: {str(e)}\n"
-                    "Please check your network connection and AWS credentials."
-                )
+            return _fmt_kb_unexpected_error(query, e)
     
     return query_knowledge_base
 
@@ -235,7 +477,7 @@ if kb_tool:
     tools.append(kb_tool)
 
 
-def validate_guardrails_config() -> Optional[dict]:
+def validate_guardrails_config() -> Optional[Mapping[str, str]]:
     """
     Validate and build GuardRails configuration.
     
@@ -247,7 +489,7 @@ def validate_guardrails_config() -> Optional[dict]:
     - Custom word filters
     
     Returns:
-        dict: GuardRails configuration for ChatBedrock, or None if not configured
+        Mapping: Read-only GuardRails configuration for ChatBedrock, or None if not configured
         
     Raises:
         ValueError: If GuardRail ID is provided but version is missing
@@ -263,21 +505,23 @@ def validate_guardrails_config() -> Optional[dict]:
             "Example: export BEDROCK_GUARDRAIL_VERSION=1"
         )
     
-    logger.info(f"GuardRails: enabled (ID: {GUARDRAIL_ID}, Version: {GUARDRAIL_VERSION})")
+    logger.info("GuardRails: enabled (ID: %s, Version: %s)", GUARDRAIL_ID, GUARDRAIL_VERSION)
     
     # Build GuardRails configuration for Bedrock
     # - guardrailIdentifier: The unique ID of your GuardRail resource
     # - guardrailVersion: Version number (e.g., "1", "2") or "DRAFT" for testing
     # - trace: Enable trace logging to see why content was blocked (useful for debugging)
-    return {
+    # The config is built once at import and shared, so hand out a read-only view
+    return MappingProxyType({
         "guardrailIdentifier": GUARDRAIL_ID,
         "guardrailVersion": GUARDRAIL_VERSION,
         "trace": "enabled"
-    }
+    })
 
 
 # Validate and get GuardRails configuration
 guardrails_config = validate_guardrails_config()
+GUARDRAILS_ENABLED = guardrails_config is not None
 
 # Initialize LLM with optional GuardRails
 # If guardrails_config is None, the LLM works normally without content filtering
@@ -286,16 +530,18 @@ guardrails_config = validate_guardrails_config()
 # NOTE: We conditionally pass the guardrails parameter only when it's not None
 # because langchain_aws has a bug where it tries to call .get() on None
 # in the _identifying_params property.
-if guardrails_config:
+if GUARDRAILS_ENABLED:
     llm = ChatBedrock(
         model_id=MODEL_ID,
         region_name=REGION,
         guardrails=guardrails_config,
+        config=Config(max_pool_connections=LLM_MAX_CONCURRENCY),
     )
 else:
     llm = ChatBedrock(
         model_id=MODEL_ID,
         region_name=REGION,
+        config=Config(max_pool_connections=LLM_MAX_CONCURRENCY),
     )
 
 # Create agent using langgraph.prebuilt.create_react_agent
@@ -308,6 +554,21 @@ agent = create_react_agent(
 # Create BedrockAgentCoreApp
 app = BedrockAgentCoreApp()
 
+# Default executor for the loop that runs handle_request (see LLM_MAX_CONCURRENCY)
+_llm_executor = ThreadPoolExecutor(
+    max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="bedrock-stream"
+)
+_executor_loop = None
+
+
+def _ensure_default_executor() -> None:
+    """Install the sized default executor on the running loop, once per loop."""
+    global _executor_loop
+    loop = asyncio.get_running_loop()
+    if loop is not _executor_loop:
+        loop.set_default_executor(_llm_executor)
+        _executor_loop = loop
+
 
 @app.entrypoint
 async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
@@ -338,48 +599,87 @@ async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
     prompt = payload.get("prompt", "")
 
     if not prompt:
-        yield json.dumps({"error": "No prompt provided"})
+        yield ERROR_NO_PROMPT
         return
 
-    # LangChain v1 uses dict format for messages
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
+    _ensure_default_executor()
+
+    # Passing a HumanMessage directly skips LangGraph's dict-to-message conversion
+    input_data = {"messages": [HumanMessage(content=prompt)]}
+
+    # Pending text for the next frame and when the previous frame was yielded
+    frame = []
+    frame_len = 0
+    last_yield = time.monotonic()
 
     try:
         async for event in agent.astream(input_data, stream_mode="messages"):
-            if isinstance(event, tuple) and len(event) >= 2:
-                chunk, metadata = event[0], event[1]
-                # Only yield AI model text responses from the 'agent' node
-                # Skip tool calls and tool results
-                # Note: create_react_agent uses 'agent' as the node name, not 'model'
-                if metadata.get("langgraph_node") != "agent":
-                    continue
-                if hasattr(chunk, "content") and chunk.content:
-                    content = chunk.content
-                    if isinstance(content, list):
-                        for block in content:
-                            # Only yield text blocks, skip tool_use blocks
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                text = block.get("text", "")
-                                if text:
-                                    yield text
-                    elif isinstance(content, str) and content:
-                        yield content
+            # stream_mode="messages" yields (message_chunk, metadata) pairs; unpack
+            # directly and only fall back for anything unexpected
+            try:
+                chunk, metadata = event
+            except (TypeError, ValueError):
+                continue
+            # Only yield AI model text responses from the 'agent' node
+            # Skip tool calls and tool results
+            # Note: create_react_agent uses 'agent' as the node name, not 'model'
+            if metadata.get("langgraph_node") != AGENT_NODE:
+                # A tool is running, so send what the model has said so far
+                if frame:
+                    yield "".join(frame)
+                    frame.clear()
+                    frame_len = 0
+                    last_yield = time.monotonic()
+                continue
+            # Models emit many empty deltas around tool calls; they add no text
+            # but still go through the flush check below
+            content = getattr(chunk, "content", None)
+            if content:
+                # Exact type checks: content is always a plain str or list here
+                if type(content) is str:
+                    frame.append(content)
+                    frame_len += len(content)
+                elif type(content) is list:
+                    for block in content:
+                        # Only yield text blocks, skip tool_use blocks
+                        if type(block) is dict and block.get("type") == "text" and (text := block.get("text")):
+                            frame.append(text)
+                            frame_len += len(text)
+
+            if frame:
+                now = time.monotonic()
+                # Once a tool call starts, no more text comes until the tool returns
+                if (
+                    frame_len >= STREAM_FRAME_CHARS
+                    or now - last_yield >= STREAM_FRAME_INTERVAL
+                    or getattr(chunk, "tool_call_chunks", None)
+                ):
+                    yield "".join(frame)
+                    frame.clear()
+                    frame_len = 0
+                    last_yield = now
+
+        if frame:
+            yield "".join(frame)
 
     except Exception as e:
+        # Deliver any text that was streamed before the failure
+        if frame:
+            yield "".join(frame)
+            frame.clear()
+
         # GuardRails Intervention Handling
         # When GuardRails blocks content, Bedrock raises an exception with specific
         # keywords in the error message. We detect these and provide user-friendly feedback.
-        error_msg = str(e).lower()
-        
         # Check if this is a GuardRails intervention
         # Common keywords: "guardrail", "intervention", "blocked", "content policy"
-        if any(keyword in error_msg for keyword in ["guardrail", "intervention", "blocked"]):
+        if GUARDRAIL_ERROR_PATTERN.search(str(e)):
             # Log the intervention for monitoring and debugging
-            # Include the first 100 characters of the prompt for context
+            # Include the first 100 characters of the prompt for context;
+            # %.100s truncates only if the record is actually emitted
             logger.warning(
-                f"GuardRails intervention occurred. "
-                f"GuardRail ID: {GUARDRAIL_ID}, "
-                f"Prompt preview: {prompt[:100]}..."
+                "GuardRails intervention occurred. GuardRail ID: %s, Prompt preview: %.100s...",
+                GUARDRAIL_ID, prompt,
             )
             
             # Stream user-friendly message explaining the intervention
@@ -392,8 +692,8 @@ async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
             )
         else:
             # For non-GuardRails errors, log with full details and return generic error
-            logger.error(f"Error during streaming: {e}", exc_info=True)
-            yield json.dumps({"error": "An error occurred processing your request"})
+            logger.error("Error during streaming: %s", e, exc_info=True)
+            yield ERROR_GENERIC
 
 
 # For local development
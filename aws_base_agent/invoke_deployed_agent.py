@@ -10,12 +10,14 @@ Requires:
     - AWS credentials with bedrock-agentcore:InvokeAgentRuntime permission
 """
 
-import json
+import codecs
+import functools
 import sys
 import uuid
 import os
 
 import boto3
+import orjson
 
 # Replace with your deployed agent ARN (or set AGENT_ARN env var)
 AGENT_ARN = os.environ.get(
@@ -24,33 +26,49 @@ AGENT_ARN = os.environ.get(
 )
 
 
+def _new_session_id() -> str:
+    """Return a new runtime session ID (at least 33 characters, so not uuid4().hex)."""
+    return str(uuid.uuid4())
+
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    """Return the process-wide bedrock-agentcore client, created on first use."""
+    return boto3.client("bedrock-agentcore")
+
+
 def invoke_agent(prompt: str, stream: bool = False) -> str:
     """Invoke the deployed agent."""
-    client = boto3.client("bedrock-agentcore")
+    client = get_client()
 
-    payload = json.dumps({"prompt": prompt}).encode()
+    # orjson returns bytes directly, so no separate .encode() pass is needed
+    payload = orjson.dumps({"prompt": prompt})
 
     response = client.invoke_agent_runtime(
         agentRuntimeArn=AGENT_ARN,
-        runtimeSessionId=str(uuid.uuid4()),
+        runtimeSessionId=_new_session_id(),
         payload=payload,
         qualifier="DEFAULT",
     )
 
-    # Collect response chunks
-    content = []
+    # Collect response chunks as raw bytes; the full response is only needed
+    # once the stream ends, so decode it in one pass instead of per chunk
+    buf = bytearray()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
     for chunk in response.get("response", []):
-        decoded = chunk.decode("utf-8")
-        content.append(decoded)
+        buf.extend(chunk)
         if stream:
-            print(decoded, end="", flush=True)
-
-    full_response = "".join(content)
+            # The incremental decoder holds back multi-byte characters split across chunks
+            print(decoder.decode(chunk), end="", flush=True)
+    if stream:
+        # Emit any bytes still held back if the stream ended mid-character
+        print(decoder.decode(b"", final=True), end="", flush=True)
 
+    # orjson parses the accumulated bytes directly; decode only for the plain-text fallback
     try:
-        return json.loads(full_response)
-    except json.JSONDecodeError:
-        return full_response
+        return orjson.loads(buf)
+    except orjson.JSONDecodeError:
+        return buf.decode("utf-8")
 
 
 def main():
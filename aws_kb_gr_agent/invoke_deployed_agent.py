@@ -27,12 +27,18 @@ Requires:
 """
 
 import argparse
-import json
+import codecs
+import functools
+import io
 import os
 import sys
+import time
 import uuid
+from typing import Iterator
 
 import boto3
+import orjson
+from botocore.config import Config
 
 
 # Replace with your deployed agent ARN (or set AGENT_ARN env var)
@@ -41,26 +47,56 @@ AGENT_ARN = os.environ.get(
     "arn:aws:bedrock-agentcore:us-east-1:YOUR_ACCOUNT_ID:runtime/YOUR_AGENT_ID",
 )
 
+# Streamed output is flushed to the terminal at most this often (seconds)
+STREAM_FLUSH_INTERVAL = 0.05
 
-def invoke_agent(
+
+def _new_session_id() -> str:
+    """
+    Return a new AgentCore runtime session ID.
+    
+    runtimeSessionId must be at least 33 characters, so the dashed 36-character
+    UUID form is used; the 32-character uuid4().hex would be rejected.
+    """
+    return str(uuid.uuid4())
+
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    """
+    Return the process-wide bedrock-agentcore client.
+    
+    Building a boto3 client loads the service model and walks the credential
+    chain, so it is created once on first use and reused by every invocation,
+    keeping its pooled TLS connections warm between calls.
+    """
+    return boto3.client(
+        "bedrock-agentcore",
+        config=Config(
+            max_pool_connections=64,
+            tcp_keepalive=True,
+            retries={"mode": "adaptive", "max_attempts": 3},
+        ),
+    )
+
+
+def iter_agent_response(
     prompt: str,
     actor_id: str = "default-user",
     thread_id: str = None,
-    stream: bool = True,
-) -> str:
+) -> Iterator[str]:
     """
-    Invoke the deployed agent with optional memory support.
+    Invoke the deployed agent and yield its response text as it streams in.
     
     Args:
         prompt: The user's message
         actor_id: User identifier for memory isolation
         thread_id: Conversation thread ID for memory persistence
-        stream: Whether to stream output to console
         
-    Returns:
-        The agent's response
+    Yields:
+        Decoded response text, chunk by chunk
     """
-    client = boto3.client("bedrock-agentcore")
+    client = get_client()
     
     # Build payload with memory parameters
     payload_data = {
@@ -74,31 +110,68 @@ def invoke_agent(
     else:
         payload_data["thread_id"] = str(uuid.uuid4())
     
-    payload = json.dumps(payload_data).encode()
+    # orjson returns bytes directly, so no separate .encode() pass is needed
+    payload = orjson.dumps(payload_data)
     
     response = client.invoke_agent_runtime(
         agentRuntimeArn=AGENT_ARN,
-        runtimeSessionId=str(uuid.uuid4()),
+        runtimeSessionId=_new_session_id(),
         payload=payload,
         qualifier="DEFAULT",
     )
     
-    # Collect response chunks
-    content = []
+    # The incremental decoder holds back multi-byte characters split across chunks
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
     for chunk in response.get("response", []):
-        decoded = chunk.decode("utf-8")
-        content.append(decoded)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def invoke_agent(
+    prompt: str,
+    actor_id: str = "default-user",
+    thread_id: str = None,
+    stream: bool = True,
+) -> str:
+    """
+    Invoke the deployed agent with optional memory support.
+    
+    Args:
+        prompt: The user's message
+        actor_id: User identifier for memory isolation
+        thread_id: Conversation thread ID for memory persistence
+        stream: Whether to stream output to console
+        
+    Returns:
+        The agent's response
+    """
+    # Collect the streamed text into a StringIO as it arrives. While streaming,
+    # write through stdout's buffer and flush on an interval rather than issuing
+    # a flush syscall for every token-sized chunk.
+    out = io.StringIO()
+    write = sys.stdout.write
+    last_flush = time.monotonic()
+    for text in iter_agent_response(prompt, actor_id=actor_id, thread_id=thread_id):
+        out.write(text)
         if stream:
-            print(decoded, end="", flush=True)
+            write(text)
+            now = time.monotonic()
+            if now - last_flush > STREAM_FLUSH_INTERVAL:
+                sys.stdout.flush()
+                last_flush = now
     
     if stream:
-        print()  # Newline after streaming
+        print(flush=True)  # Newline after streaming
     
-    full_response = "".join(content)
+    full_response = out.getvalue()
     
     try:
-        return json.loads(full_response)
-    except json.JSONDecodeError:
+        return orjson.loads(full_response)
+    except orjson.JSONDecodeError:
         return full_response
 
 
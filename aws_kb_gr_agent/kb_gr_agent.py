@@ -38,12 +38,15 @@ To deploy:
 """
 
 import os
-import json
 import logging
+import functools
 from typing import AsyncGenerator, Optional
 
+import orjson
+from botocore.config import Config
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from langchain_aws import ChatBedrock, AmazonKnowledgeBasesRetriever
+from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
 from langgraph_checkpoint_aws import AgentCoreMemorySaver
@@ -97,6 +100,25 @@ logger.info(
 REGION = "us-east-1"
 MODEL_ID = "us.anthropic.claude-sonnet-4-5-20250929-v1:0"
 
+# Connection settings shared by the boto3 clients behind the LLM, KB retriever and
+# Memory. botocore's default pool of 10 connections queues concurrent streams,
+# KB lookups and checkpoint writes behind each other; keepalive keeps idle
+# pooled TLS connections usable between requests.
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 3},
+)
+
+# AgentCoreMemorySaver runs its own retry/backoff loop, so its client only gets
+# the pool settings (stacking botocore retries on top would multiply attempts)
+MEMORY_BOTO_CONFIG = Config(max_pool_connections=64, tcp_keepalive=True)
+
+# Error bodies streamed back by handle_request, serialized once at import.
+# BedrockAgentCoreApp JSON-encodes every yielded value itself, so these stay str.
+ERROR_NO_PROMPT = orjson.dumps({"error": "No prompt provided"}).decode()
+ERROR_GENERIC = orjson.dumps({"error": "An error occurred processing your request"}).decode()
+
 # System prompt for the agent
 SYSTEM_PROMPT = """You are a helpful assistant deployed on AWS Bedrock AgentCore with advanced capabilities:
 - Content safety filtering via GuardRails
@@ -170,6 +192,18 @@ KNOWLEDGE_BASE_ID = os.getenv("BEDROCK_KNOWLEDGE_BASE_ID")  # e.g. "kb-xyz789...
 # Feature flag: Knowledge Base is enabled if KNOWLEDGE_BASE_ID is provided and non-empty
 ENABLE_KNOWLEDGE_BASE = bool(KNOWLEDGE_BASE_ID and str(KNOWLEDGE_BASE_ID).strip())
 
+# Number of documents retrieved per query, scaled to the query: short keyword-style
+# queries need only a few hits, while longer multi-part questions benefit from
+# more. Fewer results means a cheaper Retrieve and fewer tokens handed to the model.
+KB_SHORT_QUERY_WORDS = 5
+KB_RESULTS_SHORT_QUERY = 3
+KB_RESULTS_LONG_QUERY = 8
+
+# Optional search type override: "HYBRID" (semantic + keyword) or "SEMANTIC".
+# HYBRID often suits short keyword queries better, but only some vector stores
+# support it, so by default the Knowledge Base's own setting is used.
+KB_SEARCH_TYPE = os.getenv("BEDROCK_KB_SEARCH_TYPE", "").strip().upper()
+
 # Knowledge Base docs (colocated with KB flag):
 # - AWS Bedrock Knowledge Bases: https://docs.aws.amazon.com/bedrock/latest/userguide/knowledge-bases.html
 # - LangChain retriever docs: https://python.langchain.com/en/latest/modules/indexes/retrievers/overview.html
@@ -335,6 +369,24 @@ def create_knowledge_base_tool() -> Optional[callable]:
     
     logger.info(f"Knowledge Base tool: Created (ID: {KNOWLEDGE_BASE_ID})")
     
+    @functools.lru_cache(maxsize=None)
+    def get_retriever(number_of_results: int) -> AmazonKnowledgeBasesRetriever:
+        """Return the retriever for a result count, built once and reused."""
+        # Retrieval configuration controls how documents are searched and ranked
+        # - numberOfResults: How many top documents to retrieve
+        # - overrideSearchType: HYBRID or SEMANTIC (only when BEDROCK_KB_SEARCH_TYPE is set)
+        vector_search_config = {"numberOfResults": number_of_results}
+        if KB_SEARCH_TYPE:
+            vector_search_config["overrideSearchType"] = KB_SEARCH_TYPE
+        
+        # AmazonKnowledgeBasesRetriever handles the vector search and document retrieval
+        return AmazonKnowledgeBasesRetriever(
+            knowledge_base_id=KNOWLEDGE_BASE_ID,
+            region_name=REGION,
+            config=BOTO_CONFIG,
+            retrieval_config={"vectorSearchConfiguration": vector_search_config},
+        )
+    
     @tool
     def query_knowledge_base(query: str) -> str:
         """
@@ -355,25 +407,15 @@ def create_knowledge_base_tool() -> Optional[callable]:
             or an error message if the query fails
         """
         try:
-            # Initialize the Knowledge Base retriever
-            # AmazonKnowledgeBasesRetriever handles the vector search and document retrieval
-            retriever = AmazonKnowledgeBasesRetriever(
-                knowledge_base_id=KNOWLEDGE_BASE_ID,
-                region_name=REGION,
-                # Retrieval configuration controls how documents are searched and ranked
-                retrieval_config={
-                    "vectorSearchConfiguration": {
-                        # numberOfResults: How many top documents to retrieve
-                        # Higher values return more context but may include less relevant results
-                        # Recommended: 3-10 depending on your use case
-                        "numberOfResults": 5
-                    }
-                }
-            )
+            # Short queries get fewer results than long ones (see KB_SHORT_QUERY_WORDS)
+            if len(query.split()) < KB_SHORT_QUERY_WORDS:
+                retriever = get_retriever(KB_RESULTS_SHORT_QUERY)
+            else:
+                retriever = get_retriever(KB_RESULTS_LONG_QUERY)
             
             # Retrieve relevant documents using semantic similarity search
             # The query is converted to an embedding and matched against document embeddings
-            results = retriever.get_relevant_documents(query)
+            results = retriever.invoke(query)
             
             if not results:
                 return "No relevant information found in the knowledge base."
@@ -525,11 +567,13 @@ if guardrails_config:
         model_id=MODEL_ID,
         region_name=REGION,
         guardrails=guardrails_config,
+        config=BOTO_CONFIG,
     )
 else:
     llm = ChatBedrock(
         model_id=MODEL_ID,
         region_name=REGION,
+        config=BOTO_CONFIG,
     )
 
 logger.info(f"LLM initialized: {MODEL_ID} in {REGION}")
@@ -567,7 +611,7 @@ def initialize_memory() -> tuple[Optional[AgentCoreMemorySaver], bool]:
     
     try:
         # Attempt to initialize Memory checkpointer
-        checkpointer = AgentCoreMemorySaver(MEMORY_ID, region_name=REGION)
+        checkpointer = AgentCoreMemorySaver(MEMORY_ID, region_name=REGION, config=MEMORY_BOTO_CONFIG)
         logger.info(f"Memory: Successfully initialized (ID: {MEMORY_ID})")
         return checkpointer, True
     
@@ -605,6 +649,41 @@ logger.info("Agent created successfully with all configured features")
 # BEDROCKAGENTCOREAPP WRAPPER
 # ============================================================================
 
+# create_react_agent names its model node 'agent', not 'model'
+AGENT_NODE = "agent"
+
+
+async def _iter_text(events) -> AsyncGenerator[str, None]:
+    """
+    Yield the model's text from an agent.astream(..., stream_mode="messages") stream.
+    
+    Only AI model text from the 'agent' node is yielded; tool calls and tool
+    results are skipped. This runs once per streamed token, so it uses exact
+    type() checks and a single attribute lookup for the chunk content.
+    """
+    agent_node = AGENT_NODE
+    _str, _list, _dict = str, list, dict
+    async for event in events:
+        try:
+            chunk, metadata = event
+        except (TypeError, ValueError):
+            continue
+        if metadata.get("langgraph_node") != agent_node:
+            continue
+        content = getattr(chunk, "content", None)
+        if not content:
+            continue
+        content_type = type(content)
+        if content_type is _str:
+            yield content
+        elif content_type is _list:
+            # Bedrock's content block format: only yield text blocks, skip tool_use blocks
+            for block in content:
+                if type(block) is _dict and block.get("type") == "text":
+                    if text := block.get("text"):
+                        yield text
+
+
 # Create BedrockAgentCoreApp for deployment compatibility
 # This wrapper provides the interface required by the agentcore CLI
 app = BedrockAgentCoreApp()
@@ -654,7 +733,7 @@ async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
     prompt = payload.get("prompt", "")
     
     if not prompt:
-        yield json.dumps({"error": "No prompt provided"})
+        yield ERROR_NO_PROMPT
         return
     
     # Extract Memory configuration from payload
@@ -664,8 +743,8 @@ async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
     actor_id = payload.get("actor_id", "default-user")
     thread_id = payload.get("thread_id", "default-session")
     
-    # LangChain v1 uses dict format for messages
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
+    # Passing a HumanMessage directly skips LangGraph's dict-to-message conversion
+    input_data = {"messages": [HumanMessage(content=prompt)]}
     
     # Config for memory persistence (only used if Memory is enabled)
     # The "configurable" dict is passed to the AgentCoreMemorySaver checkpointer
@@ -684,26 +763,8 @@ async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
         # - If GuardRails is enabled: All content is filtered automatically
         # - If Knowledge Base is enabled: Agent can call query_knowledge_base tool
         logger.info(f"Starting agent.astream with prompt: {prompt[:50]}...")
-        async for event in agent.astream(input_data, config=config, stream_mode="messages"):
-            if isinstance(event, tuple) and len(event) >= 2:
-                chunk, metadata = event[0], event[1]
-                # Only yield AI model text responses from the 'agent' node
-                # Skip tool calls and tool results
-                # Note: create_react_agent uses 'agent' as the node name, not 'model'
-                if metadata.get("langgraph_node") != "agent":
-                    continue
-                if hasattr(chunk, "content") and chunk.content:
-                    content = chunk.content
-                    # Handle Bedrock's content block format
-                    if isinstance(content, list):
-                        for block in content:
-                            # Only yield text blocks, skip tool_use blocks
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                text = block.get("text", "")
-                                if text:
-                                    yield text
-                    elif isinstance(content, str) and content:
-                        yield content
+        async for text in _iter_text(agent.astream(input_data, config=config, stream_mode="messages")):
+            yield text
         logger.info("Agent streaming completed")
     
     except Exception as e:
@@ -743,7 +804,7 @@ async def handle_request(payload: dict, **kwargs) -> AsyncGenerator[str, None]:
             # - LLM errors
             # - Tool execution errors
             logger.error(f"Error during agent streaming: {e}", exc_info=True)
-            yield json.dumps({"error": "An error occurred processing your request"})
+            yield ERROR_GENERIC
 
 
 # ============================================================================
@@ -3,6 +3,7 @@
 
 Usage:
   python tests/test_kb_gr_memory.py --query "your question"
+  python tests/test_kb_gr_memory.py --query "first question" --query "second question"
 
 This script attempts to:
  - Query an AWS Bedrock Knowledge Base via `AmazonKnowledgeBasesRetriever` when
@@ -25,43 +26,106 @@ Relevant docs:
 """
 
 import os
+import re
+import asyncio
 import sys
 import argparse
+import functools
 import logging
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("test_kb_gr_memory")
 
 
+@dataclass(frozen=True, slots=True)
+class Env:
+    """Environment settings used by the harness, read once when constructed."""
+
+    kb_id: Optional[str] = field(default_factory=lambda: os.getenv("BEDROCK_KNOWLEDGE_BASE_ID"))
+    guardrail_id: Optional[str] = field(default_factory=lambda: os.getenv("BEDROCK_GUARDRAIL_ID"))
+    memory_id: Optional[str] = field(default_factory=lambda: os.getenv("BEDROCK_MEMORY_ID"))
+    region: str = field(default_factory=lambda: os.getenv("AWS_REGION", "us-east-1"))
+
+
+ENV = Env()
+
+
 def test_local_kb_search(query: str, kb_dir: str = "example_knowledge_base") -> str:
     """Simple fallback: search for query substring in repo KB files."""
     kb_path = Path(kb_dir)
     if not kb_path.exists():
         return f"Local KB folder not found at {kb_dir}"
 
-    results = []
-    for f in sorted(kb_path.glob("**/*")):
-        if f.is_file():
-            text = f.read_text(encoding="utf-8", errors="ignore")
-            if query.lower() in text.lower():
-                excerpt = text.lower().split(query.lower(), 1)[0][-200:]
-                results.append(f"{f}: ...{excerpt}>>{query}<<...")
+    # One case-insensitive pass over each file's text: no lowercased copy, and the
+    # match offset gives the excerpt without re-scanning. Matching str rather than
+    # bytes keeps IGNORECASE Unicode-aware (e.g. "É" matches "é").
+    pattern = re.compile(re.escape(query), re.IGNORECASE)
+
+    def _scan(f: Path) -> Optional[str]:
+        text = f.read_text(encoding="utf-8", errors="ignore")
+        m = pattern.search(text)
+        if not m:
+            return None
+        excerpt = text[max(0, m.start() - 200):m.start()]
+        return f"{f}: ...{excerpt}>>{query}<<..."
+
+    # File reads are I/O-bound, so scan them concurrently; map() keeps sorted order
+    files = [f for f in sorted(kb_path.glob("**/*")) if f.is_file()]
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        results = [r for r in executor.map(_scan, files) if r is not None]
 
     if not results:
         return "No matches found in local knowledge base."
     return "\n".join(results[:10])
 
 
-def test_kb_aws(query: str, kb_id: str, region: str = "us-east-1") -> str:
+@functools.lru_cache(maxsize=1)
+def _boto_config():
+    """Return the shared botocore Config: a larger keepalive pool and adaptive retries."""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=64,
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 3},
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _kb_runtime_client(region: str):
+    """Return a cached bedrock-agent-runtime client for `region`."""
+    import boto3
+    return boto3.client("bedrock-agent-runtime", region_name=region, config=_boto_config())
+
+
+@functools.lru_cache(maxsize=16)
+def _get_retriever(kb_id: str, region: str, n: int):
+    """Return a cached retriever for (`kb_id`, `region`, `n` results).
+
+    The retriever is given the shared runtime client so it does not build its own.
+    """
+    from langchain_aws import AmazonKnowledgeBasesRetriever
+    return AmazonKnowledgeBasesRetriever(
+        knowledge_base_id=kb_id,
+        region_name=region,
+        retrieval_config={"vectorSearchConfiguration": {"numberOfResults": n}},
+        client=_kb_runtime_client(region),
+    )
+
+
+async def test_kb_aws(query: str, kb_id: str, region: str = "us-east-1") -> str:
     """Attempt to query AWS Knowledge Base via LangChain's AmazonKnowledgeBasesRetriever.
 
     This is best-effort: it will print helpful errors and links if the call fails.
+    The query is awaited with `ainvoke`, so several queries can run concurrently.
     """
     try:
-        from langchain_aws import AmazonKnowledgeBasesRetriever
+        import langchain_aws  # noqa: F401
     except Exception as e:
         logger.error("langchain_aws not available or import failed: %s", e)
         return (
@@ -70,13 +134,9 @@ def test_kb_aws(query: str, kb_id: str, region: str = "us-east-1") -> str:
         )
 
     try:
-        retriever = AmazonKnowledgeBasesRetriever(
-            knowledge_base_id=kb_id,
-            region_name=region,
-            retrieval_config={"vectorSearchConfiguration": {"numberOfResults": 5}},
-        )
+        retriever = _get_retriever(kb_id, region, 5)
 
-        docs = retriever.get_relevant_documents(query)
+        docs = await retriever.ainvoke(query)
         if not docs:
             return "No relevant documents returned from AWS Knowledge Base."
 
@@ -96,6 +156,18 @@ def test_kb_aws(query: str, kb_id: str, region: str = "us-east-1") -> str:
         )
 
 
+async def test_kb_aws_queries(queries: list[str], kb_id: str, region: str = "us-east-1") -> list[str]:
+    """Run `test_kb_aws` for each query concurrently, returning results in order."""
+    return await asyncio.gather(*(test_kb_aws(q, kb_id, region) for q in queries))
+
+
+@functools.lru_cache(maxsize=None)
+def _bedrock_client(region: str):
+    """Return a cached Bedrock control-plane client for `region`."""
+    import boto3
+    return boto3.client("bedrock", region_name=region, config=_boto_config())
+
+
 def test_guardrails_list(region: str = "us-east-1") -> str:
     """Attempt to list GuardRails via boto3 bedrock client (best-effort).
 
@@ -103,8 +175,7 @@ def test_guardrails_list(region: str = "us-east-1") -> str:
     provide a pointer to the AWS Console.
     """
     try:
-        import boto3
-        client = boto3.client("bedrock", region_name=region)
+        client = _bedrock_client(region)
         # Best-effort call. Some SDK versions may not have `list_guardrails`.
         if hasattr(client, "list_guardrails"):
             resp = client.list_guardrails()
@@ -123,6 +194,22 @@ def test_guardrails_list(region: str = "us-east-1") -> str:
         )
 
 
+_SAVE_NAMES = ("save_state", "save", "set", "put")
+_LOAD_NAMES = ("load_state", "load", "get")
+_MEMORY_METHODS_CACHE: dict[type, tuple[Optional[str], Optional[str]]] = {}
+
+
+def _memory_methods(cls: type) -> tuple[Optional[str], Optional[str]]:
+    """Return the first (save, load) method names defined on `cls`, cached per class."""
+    names = _MEMORY_METHODS_CACHE.get(cls)
+    if names is None:
+        names = _MEMORY_METHODS_CACHE[cls] = (
+            next((n for n in _SAVE_NAMES if hasattr(cls, n)), None),
+            next((n for n in _LOAD_NAMES if hasattr(cls, n)), None),
+        )
+    return names
+
+
 def test_memory(memory_id: str, region: str = "us-east-1") -> str:
     """Attempt to initialize `AgentCoreMemorySaver` and perform a minimal save/load.
 
@@ -152,25 +239,22 @@ def test_memory(memory_id: str, region: str = "us-east-1") -> str:
     actions = []
     test_payload = {"test_key": "test_value"}
 
-    # save-like
-    for save_name in ("save_state", "save", "set", "put"):
-        if hasattr(cp, save_name):
-            try:
-                getattr(cp, save_name)(test_payload)
-                actions.append(f"Called {save_name}() successfully")
-                break
-            except Exception:
-                actions.append(f"{save_name}() exists but raised an exception: {traceback.format_exc()}" )
-
-    # load-like
-    for load_name in ("load_state", "load", "get"):
-        if hasattr(cp, load_name):
-            try:
-                val = getattr(cp, load_name)()
-                actions.append(f"Called {load_name}() successfully, returned type: {type(val)}")
-                break
-            except Exception:
-                actions.append(f"{load_name}() exists but raised an exception: {traceback.format_exc()}")
+    # save-like / load-like, resolved once per checkpointer class
+    save_name, load_name = _memory_methods(type(cp))
+
+    if save_name:
+        try:
+            getattr(cp, save_name)(test_payload)
+            actions.append(f"Called {save_name}() successfully")
+        except Exception:
+            actions.append(f"{save_name}() exists but raised an exception: {traceback.format_exc()}" )
+
+    if load_name:
+        try:
+            val = getattr(cp, load_name)()
+            actions.append(f"Called {load_name}() successfully, returned type: {type(val)}")
+        except Exception:
+            actions.append(f"{load_name}() exists but raised an exception: {traceback.format_exc()}")
 
     if not actions:
         actions.append("No obvious save/load methods found on the checkpointer.\nAvailable attrs: " + ", ".join(sorted(dir(cp))))
@@ -180,21 +264,29 @@ def test_memory(memory_id: str, region: str = "us-east-1") -> str:
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--query", default="support", help="Query string to search KB")
-    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    parser.add_argument(
+        "--query",
+        action="append",
+        help="Query string to search KB (repeat to run several queries concurrently; default: support)",
+    )
+    parser.add_argument("--region", default=ENV.region)
     args = parser.parse_args()
+    queries = args.query or ["support"]
 
-    kb_id = os.getenv("BEDROCK_KNOWLEDGE_BASE_ID")
-    guardrail_id = os.getenv("BEDROCK_GUARDRAIL_ID")
-    memory_id = os.getenv("BEDROCK_MEMORY_ID")
+    kb_id = ENV.kb_id
+    guardrail_id = ENV.guardrail_id
+    memory_id = ENV.memory_id
 
     print("\n=== Knowledge Base Test ===\n")
     if kb_id:
         print(f"Using BEDROCK_KNOWLEDGE_BASE_ID={kb_id} (region={args.region})")
-        print(test_kb_aws(args.query, kb_id, args.region))
+        results = asyncio.run(test_kb_aws_queries(queries, kb_id, args.region))
+        for query, result in zip(queries, results, strict=True):
+            print(f"--- {query} ---\n{result}")
     else:
         print("No BEDROCK_KNOWLEDGE_BASE_ID set; running local-file fallback against example_knowledge_base/")
-        print(test_local_kb_search(args.query))
+        for query in queries:
+            print(f"--- {query} ---\n{test_local_kb_search(query)}")
 
     print("\n=== GuardRails Test ===\n")
     if guardrail_id:
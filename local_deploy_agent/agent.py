@@ -7,9 +7,12 @@ Demonstrates streaming with create_agent and AgentCore Memory integration.
 import os
 import logging
 from typing import AsyncGenerator, Optional
-from langchain_aws import ChatBedrock, AmazonKnowledgeBasesRetriever
+from langchain_aws import AmazonKnowledgeBasesRetriever
+from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
+
+from agent_factory import get_agent, get_llm
+from stream_utils import iter_text
 
 # Configure logging
 logging.basicConfig(
@@ -110,7 +113,7 @@ def create_knowledge_base_tool():
             
             # Retrieve relevant documents using semantic similarity search
             # The query is converted to an embedding and matched against document embeddings
-            results = retriever.get_relevant_documents(query)
+            results = retriever.invoke(query)
             
             if not results:
                 return "No relevant information found in the knowledge base."
@@ -280,27 +283,15 @@ guardrails_config = validate_guardrails_config()
 # If guardrails_config is None, the LLM works normally without content filtering
 # If guardrails_config is provided, all LLM responses will be filtered by GuardRails
 #
-# NOTE: We conditionally pass the guardrails parameter only when it's not None
-# because langchain_aws has a bug where it tries to call .get() on None
-# in the _identifying_params property.
+# get_llm() builds each distinct LLM once per process on a shared bedrock-runtime
+# client, so other modules importing this one reuse the same connection pool.
 if guardrails_config:
-    llm = ChatBedrock(
-        model_id=MODEL_ID,
-        region_name=REGION,
-        guardrails=guardrails_config,
-    )
+    llm = get_llm(MODEL_ID, REGION, GUARDRAIL_ID, GUARDRAIL_VERSION)
 else:
-    llm = ChatBedrock(
-        model_id=MODEL_ID,
-        region_name=REGION,
-    )
+    llm = get_llm(MODEL_ID, REGION)
 
 # Create the agent using langgraph.prebuilt.create_react_agent
-agent = create_react_agent(
-    model=llm,
-    tools=tools,
-    prompt=SYSTEM_PROMPT,
-)
+agent = get_agent(llm, tools, SYSTEM_PROMPT)
 
 
 async def stream_response(prompt: str) -> AsyncGenerator[str, None]:
@@ -325,29 +316,13 @@ async def stream_response(prompt: str) -> AsyncGenerator[str, None]:
     Yields:
         str: Response tokens from the agent, or error message if intervention occurs
     """
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
+    input_data = {"messages": [HumanMessage(content=prompt)]}
 
     try:
-        async for event in agent.astream(input_data, stream_mode="messages"):
-            if isinstance(event, tuple) and len(event) >= 2:
-                chunk, metadata = event[0], event[1]
-                # Only yield AI model text responses from the 'agent' node
-                # Skip tool calls and tool results
-                # Note: create_react_agent uses 'agent' as the node name, not 'model'
-                if metadata.get("langgraph_node") != "agent":
-                    continue
-                if hasattr(chunk, "content") and chunk.content:
-                    content = chunk.content
-                    # Handle Bedrock's content block format
-                    if isinstance(content, list):
-                        for block in content:
-                            # Only yield text blocks, skip tool_use blocks
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                text = block.get("text", "")
-                                if text:
-                                    yield text
-                    elif isinstance(content, str) and content:
-                        yield content
+        # Only AI model text from the 'agent' node is yielded; tool calls and
+        # tool results are skipped by iter_text
+        async for text in iter_text(agent.astream(input_data, stream_mode="messages")):
+            yield text
     
     except Exception as e:
         # GuardRails Intervention Handling
@@ -393,7 +368,7 @@ async def invoke_agent(prompt: str) -> str:
     Returns:
         str: Agent's response or error message if intervention occurs
     """
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
+    input_data = {"messages": [HumanMessage(content=prompt)]}
     
     try:
         result = await agent.ainvoke(input_data)
@@ -0,0 +1,152 @@
+"""
+Cached construction of the Bedrock LLM and LangGraph agent for the local agents.
+
+Building a ChatBedrock creates its own bedrock-runtime boto3 client, which loads
+the service model, resolves credentials and opens a fresh HTTPS connection pool.
+The factories below build each distinct LLM and agent once per process, and all
+boto3 clients come from one Session with one client per (service, region), so
+modules that import each other (or are imported together by tests and the
+FastAPI server) reuse the same warm connection pools.
+"""
+
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Mapping, Optional, Sequence
+
+import boto3
+from botocore.config import Config
+from langchain_aws import ChatBedrock
+from langgraph.prebuilt import create_react_agent
+
+logger = logging.getLogger(__name__)
+
+# Settings for every client built by get_client(). botocore's default pool of 10
+# connections makes concurrent model streams, KB lookups and Memory calls queue
+# or reconnect; keepalive keeps idle pooled connections usable between turns.
+BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": 3},
+)
+
+# AgentCoreMemorySaver builds its own client and runs its own retry loop, so it
+# only takes the connection settings (botocore retries would multiply attempts)
+MEMORY_BOTO_CONFIG = Config(max_pool_connections=50, tcp_keepalive=True)
+
+
+# The credential chain is walked once, by the shared Session; afterwards each
+# request only checks the cached credentials' expiry. They are deliberately not
+# frozen into static keys: role and SSO credentials expire, and botocore can
+# only refresh them through the provider.
+@functools.lru_cache(maxsize=1)
+def get_session() -> boto3.session.Session:
+    """Return the process-wide boto3 Session, created on first use."""
+    return boto3.session.Session()
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(service_name: str, region: str):
+    """Return the shared boto3 client for a service and region."""
+    return get_session().client(service_name, region_name=region, config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm(
+    model_id: str,
+    region: str,
+    guardrail_id: Optional[str] = None,
+    guardrail_version: Optional[str] = None,
+) -> ChatBedrock:
+    """
+    Return a shared ChatBedrock for the given model, region and GuardRail.
+
+    Args:
+        model_id: Bedrock model ID
+        region: AWS region
+        guardrail_id: GuardRail resource ID, or None to run without GuardRails
+        guardrail_version: GuardRail version (e.g. "1" or "DRAFT")
+
+    Returns:
+        ChatBedrock: The cached LLM instance
+    """
+    kwargs = {
+        "model_id": model_id,
+        "region_name": region,
+        "client": get_client("bedrock-runtime", region),
+    }
+    # The guardrails parameter is only passed when set, because langchain_aws
+    # calls .get() on it in _identifying_params and fails on None
+    if guardrail_id:
+        kwargs["guardrails"] = {
+            "guardrailIdentifier": guardrail_id,
+            "guardrailVersion": guardrail_version,
+            "trace": "enabled",
+        }
+    return ChatBedrock(**kwargs)
+
+
+# Tools and checkpointers are not hashable, so agents are keyed by the identity
+# of the objects they were built from. The cache entry keeps those objects alive
+# so their ids cannot be reused by something else.
+_agents: dict[Hashable, tuple[Any, tuple, Any]] = {}
+_agents_lock = threading.Lock()
+
+
+def get_agent(
+    llm: ChatBedrock,
+    tools: Sequence[Any],
+    prompt: str,
+    checkpointer: Any = None,
+):
+    """
+    Return a shared create_react_agent graph for the given LLM, tools and prompt.
+
+    Args:
+        llm: The chat model, typically from get_llm()
+        tools: Tools available to the agent
+        prompt: System prompt
+        checkpointer: Optional LangGraph checkpointer for memory persistence
+
+    Returns:
+        The compiled agent graph
+    """
+    tools = tuple(tools)
+    key = (id(llm), tuple(map(id, tools)), prompt, id(checkpointer))
+    with _agents_lock:
+        entry = _agents.get(key)
+        if entry is None:
+            agent = create_react_agent(
+                model=llm,
+                tools=list(tools),
+                prompt=prompt,
+                checkpointer=checkpointer,
+            )
+            entry = _agents[key] = (agent, (llm, tools), checkpointer)
+    return entry[0]
+
+
+def prewarm(calls: Mapping[str, Callable[[], Any]]) -> None:
+    """
+    Run cheap AWS calls in the background to open each client's connection early.
+
+    A boto3 client connects lazily, so without this the first user request pays
+    the TCP and TLS handshakes for every endpoint it touches. Each call only has
+    to reach its endpoint: errors (AccessDenied, not found, ...) are logged and
+    ignored, since the connection is pooled either way. Returns immediately.
+
+    Args:
+        calls: Endpoint name -> zero-argument callable making one request
+    """
+    def run(name: str, call: Callable[[], Any]) -> None:
+        try:
+            call()
+            logger.debug("Prewarmed %s", name)
+        except Exception as e:
+            logger.debug("Prewarm call for %s failed: %s", name, e)
+
+    executor = ThreadPoolExecutor(max_workers=max(len(calls), 1), thread_name_prefix="prewarm")
+    for name, call in calls.items():
+        executor.submit(run, name, call)
+    executor.shutdown(wait=False)
@@ -18,30 +18,63 @@ GuardRails:
 
 Knowledge Base:
   - BEDROCK_KNOWLEDGE_BASE_ID: Your Knowledge Base resource ID from AWS Console
+  - BEDROCK_KB_PRERETRIEVE: "true" to query the KB before every turn instead of
+    exposing it as a tool (default: false)
+  - BEDROCK_KB_NUM_RESULTS: Number of document chunks retrieved per query (default: 3)
+  - BEDROCK_KB_MAX_CHARS: Most characters of retrieved text passed to the model
+    per query (default: 4000)
+  - BEDROCK_KB_PREFETCH_PATTERN: Regex; when the user's message matches, the KB
+    lookup for it starts at the same time as the model call (default: unset)
+  - BEDROCK_KB_CACHE_SIZE: Number of recent queries whose results are cached
+    (default: 512, 0 disables the cache)
+  - BEDROCK_KB_CACHE_TTL: Seconds a cached result is reused (default: 300)
 
 Memory:
   - BEDROCK_MEMORY_ID: Your Memory resource ID from AWS Console
 
+Model:
+  - BEDROCK_PROMPT_CACHE: "1" to mark the system prompt as a Bedrock prompt
+    cache point (default: off)
+
+Startup:
+  - BEDROCK_PREWARM: "1" to open the Bedrock, Knowledge Base and Memory
+    connections in the background at startup (default: off)
+
 All features are optional. If not configured, the agent works normally without them.
 """
 
+import asyncio
+import contextvars
+import functools
 import os
 import logging
+import re
+import time
+from collections import OrderedDict
 from typing import AsyncGenerator, Optional
-from langchain_aws import ChatBedrock, AmazonKnowledgeBasesRetriever
+from botocore.exceptions import ClientError
+from langchain_aws import AmazonKnowledgeBasesRetriever
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
 from langgraph_checkpoint_aws import AgentCoreMemorySaver
 
+from agent_factory import MEMORY_BOTO_CONFIG, get_client, get_llm, prewarm
+from stream_utils import ainput, iter_text, write_stream
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
 
 # Configure logging to track feature initialization and errors
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Only when run as a script; when imported (tests, another agent or server),
+# the importing application owns the logging configuration.
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -61,6 +94,16 @@ SYSTEM_PROMPT = """You are a helpful assistant with advanced capabilities:
 Be concise and helpful in your responses. Use the knowledge base tool when you need
 to answer questions based on specific documents or data sources."""
 
+# Prompt caching: Bedrock can cache the request prefix up to a cache point (tool
+# definitions plus the system prompt) and skip reprocessing it on later calls,
+# which cuts time to first token and bills cached tokens at a discount. Claude
+# only caches prefixes of at least 1024 tokens and ignores shorter ones, so this
+# is off by default and pays off once SYSTEM_PROMPT and the tools grow past that.
+#
+# Latency-optimized inference (performanceConfig) is not used: ChatBedrock's
+# InvokeModel path does not pass it, and it is not offered for MODEL_ID.
+PROMPT_CACHE = os.getenv("BEDROCK_PROMPT_CACHE", "0").lower() in ("1", "true", "yes")
+
 # ============================================================================
 # FEATURE 1: GUARDRAILS CONFIGURATION
 # ============================================================================
@@ -121,6 +164,48 @@ KNOWLEDGE_BASE_ID = os.getenv("BEDROCK_KNOWLEDGE_BASE_ID", "")
 # Feature flag: Knowledge Base is enabled if KNOWLEDGE_BASE_ID is provided
 ENABLE_KNOWLEDGE_BASE = bool(KNOWLEDGE_BASE_ID)
 
+# Pre-retrieval mode: when the Knowledge Base is the agent's main grounding source,
+# query it once with the user's message before the model runs and put the results
+# in the system prompt. As a tool, a KB question costs two model calls (one to pick
+# the tool, one to answer); pre-retrieved, it costs one. The trade-off is a
+# Retrieve call on every turn, including turns that don't need the KB.
+KB_PRERETRIEVE = ENABLE_KNOWLEDGE_BASE and os.getenv(
+    "BEDROCK_KB_PRERETRIEVE", "false"
+).lower() in ("1", "true", "yes")
+
+# Every retrieved chunk becomes model input tokens on this turn (and, as a tool
+# result, on every later turn of the thread), which costs both latency and money.
+# KB_NUM_RESULTS limits how many chunks are fetched, and KB_MAX_CHARS caps their
+# combined size: chunks are kept in relevance order until the budget is used up.
+KB_NUM_RESULTS = int(os.getenv("BEDROCK_KB_NUM_RESULTS", "3"))
+KB_MAX_CHARS = int(os.getenv("BEDROCK_KB_MAX_CHARS", "4000"))
+
+# Results cache: a repeated question (same words, ignoring case and spacing) is
+# answered from memory instead of another Retrieve call. Entries expire after
+# KB_CACHE_TTL seconds so newly ingested documents show up without a restart.
+KB_CACHE_SIZE = int(os.getenv("BEDROCK_KB_CACHE_SIZE", "512"))
+KB_CACHE_TTL = float(os.getenv("BEDROCK_KB_CACHE_TTL", "300"))
+
+# Speculative prefetch: with the KB as a tool, a KB question runs model call ->
+# Retrieve -> model call. For messages matching BEDROCK_KB_PREFETCH_PATTERN (for
+# example "(?i)acme|policy|product"), the Retrieve for the user's message starts
+# alongside the first model call, and if the model then asks the tool that same
+# question the result is already (or nearly) there. A miss costs one unused
+# Retrieve call.
+KB_PREFETCH_PATTERN = os.getenv("BEDROCK_KB_PREFETCH_PATTERN", "")
+KB_PREFETCH_RE = re.compile(KB_PREFETCH_PATTERN) if KB_PREFETCH_PATTERN else None
+
+# The current turn's prefetch: (normalized query, task producing the tool output).
+# A context variable, so concurrent turns each see only their own prefetch.
+_kb_prefetch: contextvars.ContextVar[Optional[tuple[str, asyncio.Task]]] = (
+    contextvars.ContextVar("kb_prefetch", default=None)
+)
+
+
+def _normalize_query(query: str) -> str:
+    """Return the form of a KB query used to match cached and prefetched results."""
+    return " ".join(query.lower().split())
+
 # ============================================================================
 # FEATURE 3: MEMORY CONFIGURATION
 # ============================================================================
@@ -202,11 +287,13 @@ def validate_configuration() -> None:
             )
 
 
-# Run configuration validation at startup
+# Run configuration validation at startup. The IDs come from the environment,
+# so they can only be checked once the process has them; the checks are a few
+# length comparisons and cost nothing next to building the AWS clients.
 try:
     validate_configuration()
 except ValueError as e:
-    logger.error(f"Configuration validation failed: {e}")
+    logger.error("Configuration validation failed: %s", e)
     raise
 
 # ============================================================================
@@ -214,23 +301,15 @@ except ValueError as e:
 # ============================================================================
 
 # Log which features are enabled/disabled at startup
-# This helps users understand the agent's capabilities
-logger.info("=" * 60)
-logger.info("Bedrock Agents Feature Status:")
-logger.info(f"  GuardRails:     {'ENABLED' if ENABLE_GUARDRAILS else 'DISABLED'}")
-if ENABLE_GUARDRAILS:
-    logger.info(f"    - ID: {GUARDRAIL_ID}")
-    logger.info(f"    - Version: {GUARDRAIL_VERSION}")
-
-logger.info(f"  Knowledge Base: {'ENABLED' if ENABLE_KNOWLEDGE_BASE else 'DISABLED'}")
-if ENABLE_KNOWLEDGE_BASE:
-    logger.info(f"    - ID: {KNOWLEDGE_BASE_ID}")
-
-logger.info(f"  Memory:         {'ENABLED' if ENABLE_MEMORY else 'DISABLED'}")
-if ENABLE_MEMORY:
-    logger.info(f"    - ID: {MEMORY_ID}")
-
-logger.info("=" * 60)
+# This helps users understand the agent's capabilities. One record with lazy
+# %-formatting: nothing is formatted when INFO is not enabled.
+logger.info(
+    "Bedrock Agents features: GuardRails=%s (version %s), Knowledge Base=%s, Memory=%s",
+    GUARDRAIL_ID or "disabled",
+    GUARDRAIL_VERSION,
+    KNOWLEDGE_BASE_ID or "disabled",
+    MEMORY_ID or "disabled",
+)
 
 # ============================================================================
 # TOOLS DEFINITION
@@ -244,6 +323,107 @@ def get_weather(location: str) -> str:
     return f"The weather in {location} is 72°F and sunny."
 
 
+def _trim_to_budget(contents) -> tuple[str, ...]:
+    """
+    Keep retrieved chunks, most relevant first, until KB_MAX_CHARS is reached.
+    
+    A chunk that doesn't fit is dropped along with everything after it. If even
+    the first chunk is over budget, it is cut to KB_MAX_CHARS so the model still
+    gets the best match.
+    """
+    kept = []
+    remaining = KB_MAX_CHARS
+    for content in contents:
+        if len(content) > remaining:
+            if not kept:
+                kept.append(content[:remaining])
+            break
+        kept.append(content)
+        remaining -= len(content)
+    return tuple(kept)
+
+
+# Knowledge Base error handling: one handler per AWS error code, looked up by
+# code. Each takes (error, query, error_code) and returns the message for the
+# agent; the static parts of the messages are built once at import.
+
+# ResourceNotFoundException: Knowledge Base doesn't exist or is inaccessible
+KB_NOT_FOUND_MESSAGE = (
+    f"Knowledge Base not found (ID: {KNOWLEDGE_BASE_ID}).\n"
+    "Please verify:\n"
+    "1. The Knowledge Base ID is correct in BEDROCK_KNOWLEDGE_BASE_ID\n"
+    "2. The Knowledge Base exists in the AWS Bedrock Console\n"
+    f"3. The Knowledge Base is in the {REGION} region\n"
+    "4. Your IAM permissions allow access to this Knowledge Base"
+)
+
+# AccessDeniedException: IAM permissions are insufficient
+KB_ACCESS_DENIED_MESSAGE = (
+    "Access denied to Knowledge Base.\n"
+    "Please verify your IAM permissions include:\n"
+    "- bedrock:Retrieve on the Knowledge Base resource"
+)
+
+# ThrottlingException: Too many requests
+KB_THROTTLED_MESSAGE = (
+    "Knowledge Base query was throttled due to rate limits.\n"
+    "Please try again in a moment."
+)
+
+
+def _kb_not_found(e: ClientError, query: str, error_code: str) -> str:
+    logger.error(
+        "Knowledge Base not found. ID: %s, Region: %s, Query: %.50s...",
+        KNOWLEDGE_BASE_ID, REGION, query,
+    )
+    return KB_NOT_FOUND_MESSAGE
+
+
+def _kb_validation_error(e: ClientError, query: str, error_code: str) -> str:
+    # ValidationException: Query format or parameters are invalid
+    logger.error(
+        "Knowledge Base query validation failed. ID: %s, Query: %.50s..., Error: %s",
+        KNOWLEDGE_BASE_ID, query, e,
+    )
+    return (
+        f"Invalid query format: {str(e)}\n"
+        "Please ensure the query is valid text and not too long."
+    )
+
+
+def _kb_access_denied(e: ClientError, query: str, error_code: str) -> str:
+    logger.error(
+        "Access denied to Knowledge Base. ID: %s, Region: %s",
+        KNOWLEDGE_BASE_ID, REGION,
+    )
+    return KB_ACCESS_DENIED_MESSAGE
+
+
+def _kb_throttled(e: ClientError, query: str, error_code: str) -> str:
+    logger.warning(
+        "Knowledge Base query throttled. ID: %s, Query: %.50s...",
+        KNOWLEDGE_BASE_ID, query,
+    )
+    return KB_THROTTLED_MESSAGE
+
+
+def _kb_service_error(e: ClientError, query: str, error_code: str) -> str:
+    # Other AWS service errors
+    logger.error(
+        "Knowledge Base AWS service error. Code: %s, ID: %s, Error: %s",
+        error_code, KNOWLEDGE_BASE_ID, e,
+    )
+    return f"Knowledge Base service error: {error_code}\nDetails: {str(e)}"
+
+
+_KB_ERROR_HANDLERS = {
+    "ResourceNotFoundException": _kb_not_found,
+    "ValidationException": _kb_validation_error,
+    "AccessDeniedException": _kb_access_denied,
+    "ThrottlingException": _kb_throttled,
+}
+
+
 def create_knowledge_base_tool() -> Optional[callable]:
     """
     Create a Knowledge Base query tool if Knowledge Base is configured.
@@ -266,10 +446,57 @@ def create_knowledge_base_tool() -> Optional[callable]:
         logger.info("Knowledge Base tool: Not created (feature disabled)")
         return None
     
-    logger.info(f"Knowledge Base tool: Created (ID: {KNOWLEDGE_BASE_ID})")
+    logger.info("Knowledge Base tool: Created (ID: %s)", KNOWLEDGE_BASE_ID)
     
+    # Build the retriever once and reuse it for every query: constructing one
+    # creates a bedrock-agent-runtime boto3 client (credential resolution,
+    # endpoint setup, a fresh connection pool), which would otherwise be paid
+    # on every tool call.
+    # AmazonKnowledgeBasesRetriever handles the vector search and document retrieval
+    retriever = AmazonKnowledgeBasesRetriever(
+        knowledge_base_id=KNOWLEDGE_BASE_ID,
+        region_name=REGION,
+        # Shared bedrock-agent-runtime client (tuned connection pool, see agent_factory)
+        client=get_client("bedrock-agent-runtime", REGION),
+        # Retrieval configuration controls how documents are searched and ranked
+        retrieval_config={
+            "vectorSearchConfiguration": {
+                # numberOfResults: How many top documents to retrieve
+                # Higher values return more context but may include less relevant results
+                # Recommended: 3-10 depending on your use case
+                "numberOfResults": KB_NUM_RESULTS
+            }
+        }
+    )
+    
+    # Normalized query -> (expiry time, page contents), least recently used first.
+    # Only touched from the event loop, so it needs no lock.
+    results_cache: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()
+    
+    async def retrieve(query: str) -> tuple[str, ...]:
+        """Return the page contents for `query`, from the cache when possible."""
+        key = _normalize_query(query)
+        now = time.monotonic()
+        entry = results_cache.get(key)
+        if entry is not None and entry[0] > now:
+            results_cache.move_to_end(key)
+            return entry[1]
+        
+        # Retrieve relevant documents using semantic similarity search
+        # The query is converted to an embedding and matched against document embeddings
+        contents = _trim_to_budget(doc.page_content for doc in await retriever.ainvoke(query))
+        if KB_CACHE_SIZE > 0:
+            results_cache[key] = (now + KB_CACHE_TTL, contents)
+            results_cache.move_to_end(key)
+            if len(results_cache) > KB_CACHE_SIZE:
+                results_cache.popitem(last=False)
+        return contents
+    
+    # The tool is a coroutine so the Retrieve round trip is awaited instead of
+    # holding a thread for its duration: the agent only runs it via astream /
+    # ainvoke, and other turns keep running on the event loop meanwhile.
     @tool
-    def query_knowledge_base(query: str) -> str:
+    async def query_knowledge_base(query: str) -> str:
         """
         Search the knowledge base for relevant information using RAG.
         
@@ -287,123 +514,63 @@ def create_knowledge_base_tool() -> Optional[callable]:
             Formatted results from the knowledge base with document content,
             or an error message if the query fails
         """
+        # Use this turn's speculative prefetch if it was for the same question
+        prefetched = _kb_prefetch.get()
+        if prefetched is not None and prefetched[0] == _normalize_query(query):
+            return await prefetched[1]
+        
         try:
-            # Initialize the Knowledge Base retriever
-            # AmazonKnowledgeBasesRetriever handles the vector search and document retrieval
-            retriever = AmazonKnowledgeBasesRetriever(
-                knowledge_base_id=KNOWLEDGE_BASE_ID,
-                region_name=REGION,
-                # Retrieval configuration controls how documents are searched and ranked
-                retrieval_config={
-                    "vectorSearchConfiguration": {
-                        # numberOfResults: How many top documents to retrieve
-                        # Higher values return more context but may include less relevant results
-                        # Recommended: 3-10 depending on your use case
-                        "numberOfResults": 5
-                    }
-                }
-            )
-            
-            # Retrieve relevant documents using semantic similarity search
-            # The query is converted to an embedding and matched against document embeddings
-            results = retriever.get_relevant_documents(query)
+            results = await retrieve(query)
             
             if not results:
                 return "No relevant information found in the knowledge base."
             
             # Format results for the agent
             # Each result includes the document content and optional metadata
-            formatted = []
-            for i, doc in enumerate(results, 1):
-                formatted.append(f"Result {i}:\n{doc.page_content}\n")
-            
-            return "\n".join(formatted)
+            return "\n".join(
+                f"Result {i}:\n{content}\n" for i, content in enumerate(results, 1)
+            )
         
         except Exception as e:
             # Enhanced error handling for Knowledge Base operations
-            from botocore.exceptions import ClientError
-            
             if isinstance(e, ClientError):
                 error_code = e.response['Error']['Code']
-                
-                # ResourceNotFoundException: Knowledge Base doesn't exist or is inaccessible
-                if error_code == 'ResourceNotFoundException':
-                    logger.error(
-                        f"Knowledge Base not found. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Region: {REGION}, Query: {query[:50]}..."
-                    )
-                    return (
-                        f"Knowledge Base not found (ID: {KNOWLEDGE_BASE_ID}).\n"
-                        "Please verify:\n"
-                        "1. The Knowledge Base ID is correct in BEDROCK_KNOWLEDGE_BASE_ID\n"
-                        "2. The Knowledge Base exists in the AWS Bedrock Console\n"
-                        f"3. The Knowledge Base is in the {REGION} region\n"
-                        "4. Your IAM permissions allow access to this Knowledge Base"
-                    )
-                
-                # ValidationException: Query format or parameters are invalid
-                elif error_code == 'ValidationException':
-                    logger.error(
-                        f"Knowledge Base query validation failed. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Query: {query[:50]}..., Error: {str(e)}"
-                    )
-                    return (
-                        f"Invalid query format: {str(e)}\n"
-                        "Please ensure the query is valid text and not too long."
-                    )
-                
-                # AccessDeniedException: IAM permissions are insufficient
-                elif error_code == 'AccessDeniedException':
-                    logger.error(
-                        f"Access denied to Knowledge Base. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Region: {REGION}"
-                    )
-                    return (
-                        "Access denied to Knowledge Base.\n"
-                        "Please verify your IAM permissions include:\n"
-                        "- bedrock:Retrieve on the Knowledge Base resource"
-                    )
-                
-                # ThrottlingException: Too many requests
-                elif error_code == 'ThrottlingException':
-                    logger.warning(
-                        f"Knowledge Base query throttled. "
-                        f"ID: {KNOWLEDGE_BASE_ID}, Query: {query[:50]}..."
-                    )
-                    return (
-                        "Knowledge Base query was throttled due to rate limits.\n"
-                        "Please try again in a moment."
-                    )
-                
-                # Other AWS service errors
-                else:
-                    logger.error(
-                        f"Knowledge Base AWS service error. "
-                        f"Code: {error_code}, ID: {KNOWLEDGE_BASE_ID}, Error: {str(e)}"
-                    )
-                    return f"Knowledge Base service error: {error_code}\nDetails: {str(e)}"
+                handler = _KB_ERROR_HANDLERS.get(error_code, _kb_service_error)
+                return handler(e, query, error_code)
             
             # General exceptions (network errors, timeouts, unexpected errors)
-            else:
-                logger.error(
-                    f"Unexpected Knowledge Base error. "
-                    f"ID: {KNOWLEDGE_BASE_ID}, Query: {query[:50]}..., Error: {str(e)}"
-                )
-                return (
-                    "An unexpected error occurred while searching the knowledge base.\n"
-                    f"Error: {str(e)}"
-                )
+            logger.error(
+                "Unexpected Knowledge Base error. ID: %s, Query: %.50s..., Error: %s",
+                KNOWLEDGE_BASE_ID, query, e,
+            )
+            return (
+                "An unexpected error occurred while searching the knowledge base.\n"
+                f"Error: {str(e)}"
+            )
     
     return query_knowledge_base
 
 
-# Initialize tools list with basic tools
-tools = [get_weather]
+# The Knowledge Base tool, LLM, Memory checkpointer and agent are built on first
+# use rather than at import, so importing this module creates no AWS clients and
+# a feature that is never exercised costs nothing. Each getter caches its result.
+# The module-level names (agent, llm, checkpointer, ...) still work: they are
+# resolved through __getattr__ at the bottom of this section.
 
-# Add Knowledge Base tool if enabled
-kb_tool = create_knowledge_base_tool()
-if kb_tool:
-    tools.append(kb_tool)
+@functools.cache
+def get_kb_tool():
+    """Return the Knowledge Base tool, or None if Knowledge Base is disabled."""
+    return create_knowledge_base_tool()
+
+
+@functools.cache
+def get_tools() -> tuple:
+    """Return the tools offered to the model, as an immutable tuple."""
+    # Basic tools plus the Knowledge Base tool if enabled. In pre-retrieval mode
+    # the same tool is called directly before each turn, so it is not offered
+    # to the model.
+    kb_tool = None if KB_PRERETRIEVE else get_kb_tool()
+    return tuple(t for t in (get_weather, kb_tool) if t is not None)
 
 # ============================================================================
 # GUARDRAILS CONFIGURATION
@@ -424,7 +591,7 @@ def build_guardrails_config() -> Optional[dict]:
         logger.info("GuardRails config: Not configured (feature disabled)")
         return None
     
-    logger.info(f"GuardRails config: Built (ID: {GUARDRAIL_ID}, Version: {GUARDRAIL_VERSION})")
+    logger.info("GuardRails config: Built (ID: %s, Version: %s)", GUARDRAIL_ID, GUARDRAIL_VERSION)
     
     # Build GuardRails configuration for Bedrock
     # - guardrailIdentifier: The unique ID of your GuardRail resource
@@ -437,9 +604,6 @@ def build_guardrails_config() -> Optional[dict]:
     }
 
 
-# Build GuardRails configuration
-guardrails_config = build_guardrails_config()
-
 # ============================================================================
 # LLM INITIALIZATION
 # ============================================================================
@@ -448,22 +612,18 @@ guardrails_config = build_guardrails_config()
 # If guardrails_config is None, the LLM works normally without content filtering
 # If guardrails_config is provided, all LLM inputs/outputs are filtered by GuardRails
 #
-# NOTE: We conditionally pass the guardrails parameter only when it's not None
-# because langchain_aws has a bug where it tries to call .get() on None
-# in the _identifying_params property.
-if guardrails_config:
-    llm = ChatBedrock(
-        model_id=MODEL_ID,
-        region_name=REGION,
-        guardrails=guardrails_config,
-    )
-else:
-    llm = ChatBedrock(
-        model_id=MODEL_ID,
-        region_name=REGION,
-    )
-
-logger.info(f"LLM initialized: {MODEL_ID} in {REGION}")
+# get_llm() builds the LLM on the shared bedrock-runtime client (see agent_factory)
+# and only passes the guardrails parameter when GuardRails are configured.
+@functools.cache
+def get_model():
+    """Return the ChatBedrock LLM, with GuardRails if configured."""
+    if build_guardrails_config():
+        llm = get_llm(MODEL_ID, REGION, GUARDRAIL_ID, GUARDRAIL_VERSION)
+    else:
+        llm = get_llm(MODEL_ID, REGION)
+    
+    logger.info("LLM initialized: %s in %s", MODEL_ID, REGION)
+    return llm
 
 # ============================================================================
 # MEMORY INITIALIZATION
@@ -494,44 +654,247 @@ def initialize_memory() -> tuple[Optional[AgentCoreMemorySaver], bool]:
     
     try:
         # Attempt to initialize Memory checkpointer
-        checkpointer = AgentCoreMemorySaver(MEMORY_ID, region_name=REGION)
-        logger.info(f"Memory: Successfully initialized (ID: {MEMORY_ID})")
+        # Its boto3 calls are blocking, but the agent only uses the async methods
+        # (aget_tuple, aput, aput_writes, ...), which AgentCoreMemorySaver already
+        # runs on the event loop's default executor, so Memory reads and writes
+        # never block the loop and concurrent turns don't wait on each other.
+        checkpointer = AgentCoreMemorySaver(
+            MEMORY_ID, region_name=REGION, config=MEMORY_BOTO_CONFIG
+        )
+        logger.info("Memory: Successfully initialized (ID: %s)", MEMORY_ID)
         return checkpointer, True
     
     except Exception as e:
         # Memory initialization failed - agent will run without persistence
         logger.warning(
-            f"Memory initialization failed: {e}. "
-            f"Agent will run in stateless mode (no conversation persistence)."
+            "Memory initialization failed: %s. "
+            "Agent will run in stateless mode (no conversation persistence).",
+            e,
         )
         return None, False
 
 
-# Initialize Memory checkpointer
-checkpointer, memory_initialized = initialize_memory()
+@functools.cache
+def get_checkpointer() -> Optional[AgentCoreMemorySaver]:
+    """Return the Memory checkpointer, or None if Memory is disabled or failed to start."""
+    checkpointer, _ = initialize_memory()
+    return checkpointer
 
 # ============================================================================
 # AGENT CREATION
 # ============================================================================
 
+# Configurable key carrying pre-retrieved KB results into the prompt. The leading
+# double underscore keeps LangGraph from copying it into checkpoint metadata.
+KB_CONTEXT_KEY = "__kb_context"
+
+
+# The system prompt as a content block, marked as a cache point when prompt
+# caching is on. It is the same object on every call, so the cached prefix matches.
+SYSTEM_PROMPT_BLOCK = {"type": "text", "text": SYSTEM_PROMPT}
+if PROMPT_CACHE:
+    SYSTEM_PROMPT_BLOCK["cache_control"] = {"type": "ephemeral"}
+
+
+def build_prompt(state: dict, config: RunnableConfig) -> list:
+    """
+    Build the model input for pre-retrieval and prompt caching modes.
+    
+    Adds the Knowledge Base results fetched for this turn (if any) to the system
+    prompt. They are not added to the message history, so Memory does not store
+    them and they don't pile up across turns. They go in a separate block after
+    the (possibly cached) SYSTEM_PROMPT block, because they change every turn.
+    """
+    system_blocks = [SYSTEM_PROMPT_BLOCK]
+    kb_context = config.get("configurable", {}).get(KB_CONTEXT_KEY)
+    if kb_context:
+        system_blocks.append({
+            "type": "text",
+            "text": (
+                "Knowledge base results for the user's latest message "
+                "(use them when they are relevant):\n"
+                f"{kb_context}"
+            ),
+        })
+    return [SystemMessage(content=system_blocks)] + state["messages"]
+
+
 # Create the agent using langgraph.prebuilt.create_react_agent
 # The agent combines:
 # - LLM with optional GuardRails
 # - Tools (including optional Knowledge Base tool)
 # - Optional Memory checkpointer for conversation persistence
-agent = create_react_agent(
-    model=llm,
-    tools=tools,
-    prompt=SYSTEM_PROMPT,
-    checkpointer=checkpointer,  # None if memory is disabled or initialization failed
+#
+# The graph is a single 'agent' (model) node plus a 'tools' node. Tool selection
+# happens inside the model call itself, so a turn that needs no tools is exactly
+# one model call: the agent node answers and the graph ends. Only turns where the
+# model requests a tool pay for a second call.
+@functools.cache
+def get_agent():
+    """Return the agent, building it (and the LLM, tools and Memory) on first call."""
+    agent = create_react_agent(
+        model=get_model(),
+        tools=get_tools(),
+        prompt=build_prompt if KB_PRERETRIEVE or PROMPT_CACHE else SYSTEM_PROMPT,
+        checkpointer=get_checkpointer(),  # None if memory is disabled or initialization failed
+    )
+    
+    logger.info("Agent created successfully with all configured features")
+    return agent
+
+
+# Lazily built module attributes, kept for code that imports them by name
+_LAZY_ATTRIBUTES = {
+    "agent": get_agent,
+    "llm": get_model,
+    "tools": get_tools,
+    "kb_tool": get_kb_tool,
+    "checkpointer": get_checkpointer,
+    "memory_initialized": lambda: get_checkpointer() is not None,
+    "guardrails_config": build_guardrails_config,
+}
+
+
+def __getattr__(name: str):
+    factory = _LAZY_ATTRIBUTES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
+
+# ============================================================================
+# CONNECTION PREWARM
+# ============================================================================
+
+# Without prewarming, the first question pays the TCP + TLS handshakes for
+# bedrock-runtime, bedrock-agent-runtime and AgentCore Memory on top of the
+# model call. With BEDROCK_PREWARM=1 one cheap request per endpoint is made in
+# background threads at startup, so those connections are already pooled (and
+# credentials resolved) by the time the user sends a message.
+PREWARM = os.getenv("BEDROCK_PREWARM", "0").lower() in ("1", "true", "yes")
+
+if PREWARM:
+    prewarm_calls = {
+        "bedrock-runtime": lambda: get_client("bedrock-runtime", REGION).list_async_invokes(maxResults=1),
+    }
+    if ENABLE_KNOWLEDGE_BASE:
+        prewarm_calls["bedrock-agent-runtime"] = lambda: get_client(
+            "bedrock-agent-runtime", REGION
+        ).list_sessions(maxResults=1)
+    # Prewarming Memory means building the checkpointer now instead of on first use
+    if ENABLE_MEMORY and get_checkpointer():
+        # Reading a thread that doesn't exist returns nothing but opens the connection
+        prewarm_calls["bedrock-agentcore"] = lambda: get_checkpointer().get_tuple(
+            {"configurable": {"thread_id": "prewarm", "actor_id": "prewarm"}}
+        )
+    prewarm(prewarm_calls)
+
+# ============================================================================
+# GUARDRAILS INTERVENTION HANDLING
+# ============================================================================
+
+# When GuardRails blocks content, Bedrock raises an exception with specific
+# keywords in the error message. One case-insensitive regex finds any of them
+# in a single pass over the message.
+GUARDRAIL_ERROR_PATTERN = re.compile(r"guardrail|intervention|blocked", re.IGNORECASE)
+
+# User-friendly message explaining the intervention
+# This message is intentionally generic to avoid revealing policy details
+GUARDRAIL_BLOCKED_MESSAGE = (
+    "I apologize, but I cannot provide that response as it violates "
+    "content safety policies. Please rephrase your request or ask "
+    "something different."
 )
 
-logger.info("Agent created successfully with all configured features")
+
+def _guardrails_message(error: Exception, prompt: str) -> Optional[str]:
+    """
+    Return the message to show the user if `error` is a GuardRails intervention.
+    
+    Returns:
+        str: GUARDRAIL_BLOCKED_MESSAGE for an intervention, None for any other error
+    """
+    if not GUARDRAIL_ERROR_PATTERN.search(str(error)):
+        return None
+    
+    # Log the intervention for monitoring and debugging
+    logger.warning(
+        "GuardRails intervention occurred. GuardRail ID: %s, Prompt preview: %.100s...",
+        GUARDRAIL_ID, prompt,
+    )
+    return GUARDRAIL_BLOCKED_MESSAGE
 
 # ============================================================================
 # STREAMING FUNCTIONS
 # ============================================================================
 
+@functools.lru_cache(maxsize=1024)
+def _thread_configurable(actor_id: str, thread_id: str) -> dict:
+    """
+    Return the shared "configurable" dict for a conversation thread.
+    
+    Built once per (actor_id, thread_id) and reused by every turn of that thread.
+    LangGraph copies the config it is given, so sharing is safe as long as this
+    module never mutates the returned dict.
+    """
+    return {
+        "thread_id": thread_id,  # Identifies the conversation thread
+        "actor_id": actor_id,    # Identifies the user/actor
+    }
+
+
+async def _build_invocation(
+    prompt: str,
+    actor_id: str,
+    thread_id: str,
+) -> tuple[dict, dict, contextvars.Token]:
+    """
+    Build the agent input and config for one turn.
+    
+    Shared by stream_response and invoke_agent, which pass the returned token
+    to _end_turn() when the turn is over.
+    
+    Returns:
+        tuple: (input_data, config) to pass to agent.astream / agent.ainvoke,
+        and the token for this turn's prefetch
+    """
+    input_data = {"messages": [HumanMessage(content=prompt)]}
+
+    # Config for memory persistence (only used if Memory is enabled)
+    # The "configurable" dict is passed to the AgentCoreMemorySaver checkpointer
+    # to identify which conversation thread to load/save
+    configurable = _thread_configurable(actor_id, thread_id)
+
+    # Pre-retrieval mode: one Retrieve call up front instead of a tool round trip.
+    # The results are per turn, so they go in a copy, not the shared dict.
+    if KB_PRERETRIEVE:
+        configurable = {**configurable, KB_CONTEXT_KEY: await get_kb_tool().ainvoke(prompt)}
+
+    # Speculative prefetch (see KB_PREFETCH_PATTERN). The task copies the current
+    # context when it is created, so the variable is cleared first: turns that
+    # share a task (the CLI runs them all in one) would otherwise hand the new
+    # prefetch the previous turn's entry, and a repeated question would replay
+    # the previous result instead of running the real lookup.
+    _kb_prefetch.set(None)
+    prefetch = None
+    if KB_PREFETCH_RE is not None and not KB_PRERETRIEVE and KB_PREFETCH_RE.search(prompt):
+        kb_tool = get_kb_tool()
+        if kb_tool is not None:
+            prefetch = (_normalize_query(prompt), asyncio.create_task(kb_tool.ainvoke(prompt)))
+    token = _kb_prefetch.set(prefetch)
+
+    return input_data, {"configurable": configurable}, token
+
+
+def _end_turn(token: contextvars.Token) -> None:
+    """Restore the prefetch variable to what it was before the turn started."""
+    try:
+        _kb_prefetch.reset(token)
+    except ValueError:
+        # A stream closed from another context (e.g. garbage-collected) cannot
+        # reset it; the next turn clears the variable in _build_invocation anyway
+        pass
+
+
 async def stream_response(
     prompt: str,
     actor_id: str = "default-user",
@@ -582,17 +945,7 @@ async def stream_response(
     Yields:
         str: Response tokens from the agent, or error message if intervention occurs
     """
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
-
-    # Config for memory persistence (only used if Memory is enabled)
-    # The "configurable" dict is passed to the AgentCoreMemorySaver checkpointer
-    # to identify which conversation thread to load/save
-    config = {
-        "configurable": {
-            "thread_id": thread_id,  # Identifies the conversation thread
-            "actor_id": actor_id,    # Identifies the user/actor
-        }
-    }
+    input_data, config, token = await _build_invocation(prompt, actor_id, thread_id)
 
     try:
         # Stream the agent's response
@@ -600,64 +953,29 @@ async def stream_response(
         #   and saves updated memory after generating the response
         # - If GuardRails is enabled: All content is filtered automatically
         # - If Knowledge Base is enabled: Agent can call query_knowledge_base tool
-        async for event in agent.astream(input_data, config=config, stream_mode="messages"):
-            if isinstance(event, tuple) and len(event) >= 2:
-                chunk, metadata = event[0], event[1]
-                # Only yield AI model text responses from the 'agent' node
-                # Skip tool calls and tool results
-                # Note: create_react_agent uses 'agent' as the node name, not 'model'
-                if metadata.get("langgraph_node") != "agent":
-                    continue
-                if hasattr(chunk, "content") and chunk.content:
-                    content = chunk.content
-                    # Handle Bedrock's content block format
-                    if isinstance(content, list):
-                        for block in content:
-                            # Only yield text blocks, skip tool_use blocks
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                text = block.get("text", "")
-                                if text:
-                                    yield text
-                    elif isinstance(content, str) and content:
-                        yield content
+        # Only AI model text from the 'agent' node is yielded; tool calls and
+        # tool results are skipped (see stream_utils.iter_text)
+        events = get_agent().astream(input_data, config=config, stream_mode="messages")
+        async for text in iter_text(events):
+            yield text
     
     except Exception as e:
-        # ====================================================================
-        # GUARDRAILS INTERVENTION HANDLING
-        # ====================================================================
-        # When GuardRails blocks content, Bedrock raises an exception with specific
-        # keywords in the error message. We detect these and provide user-friendly feedback.
-        error_msg = str(e).lower()
-        
-        # Check if this is a GuardRails intervention
-        # Common keywords: "guardrail", "intervention", "blocked", "content policy"
-        if any(keyword in error_msg for keyword in ["guardrail", "intervention", "blocked"]):
-            # Log the intervention for monitoring and debugging
-            logger.warning(
-                f"GuardRails intervention occurred. "
-                f"GuardRail ID: {GUARDRAIL_ID}, "
-                f"Prompt preview: {prompt[:100]}..."
-            )
-            
-            # Return user-friendly message explaining the intervention
-            # This message is intentionally generic to avoid revealing policy details
-            yield (
-                "I apologize, but I cannot provide that response as it violates "
-                "content safety policies. Please rephrase your request or ask "
-                "something different."
-            )
+        # GuardRails interventions become a user-friendly message
+        message = _guardrails_message(e, prompt)
+        if message is not None:
+            yield message
         else:
-            # ================================================================
-            # OTHER ERROR HANDLING
-            # ================================================================
             # For non-GuardRails errors, log the full error and re-raise
             # This includes:
             # - Network errors
             # - AWS credential errors
             # - LLM errors
             # - Tool execution errors
-            logger.error(f"Error during agent streaming: {e}")
+            logger.error("Error during agent streaming: %s", e)
             raise
+    
+    finally:
+        _end_turn(token)
 
 
 async def invoke_agent(
@@ -686,39 +1004,23 @@ async def invoke_agent(
     Returns:
         str: Agent's complete response or error message if intervention occurs
     """
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
-    
-    # Config for memory persistence
-    config = {
-        "configurable": {
-            "thread_id": thread_id,
-            "actor_id": actor_id,
-        }
-    }
+    input_data, config, token = await _build_invocation(prompt, actor_id, thread_id)
     
     try:
-        result = await agent.ainvoke(input_data, config=config)
+        result = await get_agent().ainvoke(input_data, config=config)
         return result["messages"][-1].content
     
     except Exception as e:
         # GuardRails Intervention Handling (same logic as stream_response)
-        error_msg = str(e).lower()
-        
-        if any(keyword in error_msg for keyword in ["guardrail", "intervention", "blocked"]):
-            logger.warning(
-                f"GuardRails intervention occurred. "
-                f"GuardRail ID: {GUARDRAIL_ID}, "
-                f"Prompt preview: {prompt[:100]}..."
-            )
-            
-            return (
-                "I apologize, but I cannot provide that response as it violates "
-                "content safety policies. Please rephrase your request or ask "
-                "something different."
-            )
+        message = _guardrails_message(e, prompt)
+        if message is not None:
+            return message
         else:
-            logger.error(f"Error during agent invocation: {e}")
+            logger.error("Error during agent invocation: %s", e)
             raise
+    
+    finally:
+        _end_turn(token)
 
 
 # ============================================================================
@@ -742,6 +1044,8 @@ async def main():
     3. Run the script again
     4. The agent will remember your previous conversation!
     """
+    memory_initialized = get_checkpointer() is not None
+    
     print("\n" + "=" * 70)
     print("LangGraph + Bedrock AgentCore Demo - All Features")
     print("=" * 70)
@@ -771,18 +1075,20 @@ async def main():
 
     while True:
         try:
-            prompt = input("You: ").strip()
+            # Read input off the event loop so background tasks keep running
+            prompt = (await ainput("You: ")).strip()
             if prompt.lower() in ("quit", "exit", "q"):
                 break
             if not prompt:
                 continue
 
             print("Assistant: ", end="", flush=True)
-            async for token in stream_response(prompt, actor_id, thread_id):
-                print(token, end="", flush=True)
+            await write_stream(stream_response(prompt, actor_id, thread_id))
             print("\n")
 
-        except KeyboardInterrupt:
+        # Under asyncio.run, Ctrl+C cancels this task instead of raising
+        # KeyboardInterrupt here; treat both (and Ctrl+D) as quitting
+        except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
             break
         except Exception as e:
             print(f"\nError: {e}\n")
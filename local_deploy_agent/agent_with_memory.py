@@ -12,12 +12,16 @@ Memory Integration Overview:
 - Memory persists message history, tool calls, and agent state
 """
 
+import asyncio
 import logging
+import sys
 from typing import AsyncGenerator
-from langchain_aws import ChatBedrock
+from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
-from langgraph_checkpoint_aws import AgentCoreMemorySaver
+
+from agent_factory import MEMORY_BOTO_CONFIG, get_agent, get_llm
+from checkpointers import CachingMemorySaver
+from stream_utils import ainput, iter_text
 
 # Configure logging to track memory initialization status
 logging.basicConfig(
@@ -38,6 +42,13 @@ MODEL_ID = "us.anthropic.claude-sonnet-4-5-20250929-v1:0"
 # 3. Copy the Memory ID and paste it here
 MEMORY_ID = "YOUR_MEMORY_ID"
 
+# When checkpoints are written to Memory during a turn. LangGraph's default
+# ("async") saves a checkpoint after every step plus the pending writes of every
+# task, each one a Memory API call, so a turn with a tool call makes several.
+# "exit" keeps them in memory and saves the final state once when the turn ends,
+# which is all a chat needs: an interrupted turn is simply asked again.
+CHECKPOINT_DURABILITY = "exit"
+
 SYSTEM_PROMPT = """You are a helpful assistant with memory capabilities.
 You can remember previous conversations and user preferences.
 Be concise and helpful in your responses."""
@@ -58,11 +69,8 @@ def search_knowledge_base(query: str) -> str:
 
 tools = [get_weather, search_knowledge_base]
 
-# Initialize LLM
-llm = ChatBedrock(
-    model_id=MODEL_ID,
-    region_name=REGION,
-)
+# Initialize LLM (shared with any other module using the same model and region)
+llm = get_llm(MODEL_ID, REGION)
 
 # Initialize AgentCore Memory checkpointer with error handling
 # AgentCoreMemorySaver is a LangGraph checkpointer that stores conversation state in AWS Bedrock
@@ -79,6 +87,16 @@ llm = ChatBedrock(
 #
 # Memory is automatically saved after each agent turn and loaded at the start of each turn
 #
+# CachingMemorySaver is an AgentCoreMemorySaver that keeps each thread's latest
+# checkpoint in process, so after the first turn a thread's memory is loaded
+# without a Memory round trip at all. When it does have to read (first turn,
+# expired entry), it can start that load early (see stream_response and main),
+# so the round trip overlaps other work instead of delaying the first token.
+#
+# The saver keeps LangGraph's default serde (JsonPlusSerializer). It already
+# encodes checkpoints as msgpack through ormsgpack, a Rust extension, and it
+# round-trips LangChain message objects, which a plain orjson serde cannot.
+#
 # Error Handling:
 # If Memory initialization fails (invalid ID, network issues, permissions, etc.),
 # the agent will fall back to stateless mode (no memory persistence).
@@ -88,7 +106,7 @@ memory_enabled = False
 
 try:
     # Attempt to initialize Memory checkpointer
-    checkpointer = AgentCoreMemorySaver(MEMORY_ID, region_name=REGION)
+    checkpointer = CachingMemorySaver(MEMORY_ID, region_name=REGION, config=MEMORY_BOTO_CONFIG)
     memory_enabled = True
     logger.info(f"Memory enabled: Successfully initialized with Memory ID: {MEMORY_ID}")
 except Exception as e:
@@ -118,10 +136,10 @@ except Exception as e:
 # - Agent is stateless - no memory between calls
 # - Each call is independent with no conversation history
 # - Agent still functions normally, just without persistence
-agent = create_react_agent(
-    model=llm,
-    tools=tools,
-    prompt=SYSTEM_PROMPT,
+agent = get_agent(
+    llm,
+    tools,
+    SYSTEM_PROMPT,
     checkpointer=checkpointer,  # None if memory initialization failed
 )
 
@@ -164,7 +182,7 @@ async def stream_response(
     2. AgentCoreMemorySaver loads existing memory for this thread_id (if any)
     3. Agent processes the prompt with full conversation history
     4. Agent generates response and executes any tool calls
-    5. AgentCoreMemorySaver automatically saves updated state to AWS Bedrock
+    5. AgentCoreMemorySaver saves the updated state to AWS Bedrock when the turn ends
     6. Next call with same thread_id will have access to this conversation history
     
     Usage Patterns:
@@ -188,7 +206,7 @@ async def stream_response(
     async for token in stream_response("Start fresh", "user-1", f"session-{session_id}"):
         print(token, end="")
     """
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
+    input_data = {"messages": [HumanMessage(content=prompt)]}
 
     # Config for memory persistence
     # The "configurable" dict is passed to the AgentCoreMemorySaver checkpointer
@@ -210,33 +228,28 @@ async def stream_response(
         }
     }
 
+    # Start loading this thread's memory now; the agent picks up the prefetched
+    # checkpoint instead of issuing its own read (no-op if already in flight)
+    if checkpointer is not None:
+        checkpointer.prefetch(config)
+
     # Stream the agent's response
     # The agent automatically loads memory for this thread_id before processing
-    # and saves updated memory after generating the response
-    async for event in agent.astream(input_data, config=config, stream_mode="messages"):
-        if isinstance(event, tuple) and len(event) >= 2:
-            chunk, metadata = event[0], event[1]
-            # Only yield AI model text responses from the 'agent' node
-            # Skip tool calls and tool results
-            # Note: create_react_agent uses 'agent' as the node name, not 'model'
-            if metadata.get("langgraph_node") != "agent":
-                continue
-            if hasattr(chunk, "content") and chunk.content:
-                content = chunk.content
-                if isinstance(content, list):
-                    for block in content:
-                        # Only yield text blocks, skip tool_use blocks
-                        if isinstance(block, dict) and block.get("type") == "text":
-                            text = block.get("text", "")
-                            if text:
-                                yield text
-                elif isinstance(content, str) and content:
-                    yield content
+    # and saves updated memory after generating the response (once, at the end
+    # of the turn; see CHECKPOINT_DURABILITY)
+    # Only AI model text from the 'agent' node is yielded; tool calls and
+    # tool results are skipped by iter_text
+    events = agent.astream(
+        input_data,
+        config=config,
+        stream_mode="messages",
+        durability=CHECKPOINT_DURABILITY,
+    )
+    async for text in iter_text(events):
+        yield text
 
 
 async def main():
-    import sys
-
     if MEMORY_ID == "YOUR_MEMORY_ID":
         print("ERROR: Please set MEMORY_ID to your AgentCore Memory ID")
         print("Create one in the AWS Console: Bedrock > AgentCore > Memory")
@@ -271,7 +284,12 @@ async def main():
 
     while True:
         try:
-            prompt = input("You: ").strip()
+            # Read the thread's memory while the user is typing; input is read
+            # off the event loop, so the prefetch runs in the meantime
+            if checkpointer is not None:
+                checkpointer.prefetch({"configurable": {"thread_id": thread_id, "actor_id": actor_id}})
+
+            prompt = (await ainput("You: ")).strip()
             if prompt.lower() in ("quit", "exit", "q"):
                 break
             if not prompt:
@@ -284,13 +302,13 @@ async def main():
                 print(token, end="", flush=True)
             print("\n")
 
-        except KeyboardInterrupt:
+        # Under asyncio.run, Ctrl+C cancels this task instead of raising
+        # KeyboardInterrupt here; treat both (and Ctrl+D) as quitting
+        except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
             break
 
     print("\nGoodbye!")
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(main())
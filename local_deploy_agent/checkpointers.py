@@ -0,0 +1,280 @@
+"""
+AgentCore Memory checkpointer extensions for the local agents.
+
+At the start of every turn LangGraph reads the thread's latest checkpoint from
+AgentCore Memory before it can call the model, so that round trip sits directly
+in front of the first streamed token. PrefetchingMemorySaver lets the caller
+start that read as soon as the thread is known (for example while the user is
+still typing) and hands the result to LangGraph when it asks for it.
+
+Reading a thread's latest checkpoint means listing the thread's events, and
+that history grows with every turn. CachingMemorySaver keeps the checkpoint
+each turn saves, so the next turn on the same thread in the same process needs
+no read at all.
+
+AgentCoreMemorySaver holds no instance-wide lock: its async methods hand each
+call to the event loop's default executor, so reads and writes for different
+threads already run concurrently on one shared saver. The executor's worker
+count, not locking, bounds how many Memory calls are in flight at once.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_metadata,
+)
+from langgraph_checkpoint_aws import AgentCoreMemorySaver
+
+
+def _thread_key(config: RunnableConfig) -> tuple[str, str, str]:
+    """Return the (thread_id, actor_id, checkpoint_ns) a config refers to."""
+    configurable = config.get("configurable", {})
+    return (
+        configurable.get("thread_id"),
+        configurable.get("actor_id"),
+        configurable.get("checkpoint_ns", ""),
+    )
+
+
+class PrefetchingMemorySaver(AgentCoreMemorySaver):
+    """
+    AgentCoreMemorySaver that can read a thread's latest checkpoint ahead of time.
+
+    Call prefetch(config) from async code once the thread_id/actor_id are known.
+    The next aget_tuple() for the latest checkpoint of that thread is served
+    from the prefetched read instead of making a second round trip. A prefetched
+    result is used at most once, and any write to the thread discards it so a
+    stale checkpoint is never returned.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._prefetched: dict[tuple[str, str, str], asyncio.Task] = {}
+
+    def prefetch(self, config: RunnableConfig) -> None:
+        """Start reading the latest checkpoint for the thread in `config`."""
+        if config.get("configurable", {}).get("checkpoint_id"):
+            return
+        key = _thread_key(config)
+        if key in self._prefetched:
+            return
+        task = asyncio.get_running_loop().create_task(super().aget_tuple(config))
+        # Mark failures as retrieved; they are re-raised to whoever awaits the task
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._prefetched[key] = task
+
+    def _discard(self, key: tuple[str, str, str]) -> None:
+        task = self._prefetched.pop(key, None)
+        if task is not None and not task.done():
+            # The sync write methods run in executor threads
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def _discard_thread(self, thread_id: str, actor_id: str) -> None:
+        for key in [k for k in list(self._prefetched) if k[0] == thread_id and k[1] == actor_id]:
+            self._discard(key)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        if not config.get("configurable", {}).get("checkpoint_id"):
+            task = self._prefetched.pop(_thread_key(config), None)
+            if task is not None:
+                return await task
+        return await super().aget_tuple(config)
+
+    async def aput(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self._discard(_thread_key(config))
+        return await super().aput(config, *args, **kwargs)
+
+    async def aput_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> None:
+        self._discard(_thread_key(config))
+        return await super().aput_writes(config, *args, **kwargs)
+
+    async def aput_with_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self._discard(_thread_key(config))
+        return await super().aput_with_writes(config, *args, **kwargs)
+
+    async def adelete_thread(self, thread_id: str, actor_id: str = "") -> None:
+        self._discard_thread(thread_id, actor_id)
+        return await super().adelete_thread(thread_id, actor_id)
+
+    # The async methods above run these in the default executor; sync callers
+    # that write directly must not leave a stale prefetch behind either
+
+    def put(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self._discard(_thread_key(config))
+        return super().put(config, *args, **kwargs)
+
+    def put_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> None:
+        self._discard(_thread_key(config))
+        return super().put_writes(config, *args, **kwargs)
+
+    def put_with_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self._discard(_thread_key(config))
+        return super().put_with_writes(config, *args, **kwargs)
+
+    def delete_thread(self, thread_id: str, actor_id: str = "") -> None:
+        self._discard_thread(thread_id, actor_id)
+        return super().delete_thread(thread_id, actor_id)
+
+
+class CachingMemorySaver(PrefetchingMemorySaver):
+    """
+    PrefetchingMemorySaver that remembers each thread's latest checkpoint.
+    
+    After a checkpoint is saved (or read), the next aget_tuple() for the latest
+    checkpoint of that thread is answered from an in-process LRU cache instead
+    of AgentCore Memory. Entries expire after `cache_ttl` seconds and are
+    dropped on any write to the thread, through the sync or async API.
+    
+    Entries are kept serialized with the saver's serde, so every hit returns
+    a fresh copy and nothing the graph mutates after a save can leak into the
+    cache. Only found checkpoints are cached; a thread with no checkpoint yet
+    is read from Memory each time.
+    
+    The cache only sees this process's writes. Use it when one process serves a
+    given thread (the CLI demos, a single server worker); with several workers
+    sharing threads, a worker could serve a checkpoint another one has replaced
+    until the entry expires.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        cache_size: int = 1024,
+        cache_ttl: float = 300.0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        # (thread_id, actor_id, checkpoint_ns) -> (expiry time, serialized latest checkpoint)
+        self._cache: OrderedDict[tuple[str, str, str], tuple[float, tuple[str, bytes]]] = OrderedDict()
+        # The sync write methods invalidate from executor threads
+        self._cache_lock = threading.Lock()
+
+    def _cached(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        if config.get("configurable", {}).get("checkpoint_id"):
+            return None
+        key = _thread_key(config)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        saved_config, checkpoint, metadata, parent_config, pending_writes = self.serde.loads_typed(entry[1])
+        return CheckpointTuple(
+            config=saved_config,
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config=parent_config,
+            pending_writes=[tuple(write) for write in pending_writes],
+        )
+
+    def _store(self, config: RunnableConfig, checkpoint_tuple: CheckpointTuple) -> None:
+        if self.cache_size <= 0:
+            return
+        key = _thread_key(config)
+        serialized = self.serde.dumps_typed(tuple(checkpoint_tuple))
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, serialized)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, config: RunnableConfig) -> None:
+        """Forget the cached checkpoint for the thread in `config`."""
+        with self._cache_lock:
+            self._cache.pop(_thread_key(config), None)
+
+    def _invalidate_thread(self, thread_id: str, actor_id: str) -> None:
+        with self._cache_lock:
+            for key in [k for k in self._cache if k[0] == thread_id and k[1] == actor_id]:
+                del self._cache[key]
+
+    def prefetch(self, config: RunnableConfig) -> None:
+        if self._cached(config) is None:
+            super().prefetch(config)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        cached = self._cached(config)
+        if cached is not None:
+            return cached
+        checkpoint_tuple = await super().aget_tuple(config)
+        if checkpoint_tuple is not None and not config.get("configurable", {}).get("checkpoint_id"):
+            self._store(config, checkpoint_tuple)
+        return checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self.invalidate(config)
+        next_config = await super().aput(config, checkpoint, metadata, new_versions)
+        # Build the tuple a read of this checkpoint would return: channel values
+        # for the versioned channels, and the stored metadata
+        channel_values = checkpoint.get("channel_values", {})
+        cached_checkpoint = {
+            **checkpoint,
+            "channel_values": {
+                channel: channel_values[channel]
+                for channel in checkpoint.get("channel_versions", {})
+                if channel in channel_values
+            },
+        }
+        parent_config = None
+        parent_id = config.get("configurable", {}).get("checkpoint_id")
+        if parent_id:
+            parent_config = {"configurable": {**next_config["configurable"], "checkpoint_id": parent_id}}
+        self._store(
+            config,
+            CheckpointTuple(
+                config=next_config,
+                checkpoint=cached_checkpoint,
+                metadata=get_checkpoint_metadata(config, metadata),
+                parent_config=parent_config,
+                pending_writes=[],
+            ),
+        )
+        return next_config
+
+    async def aput_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> None:
+        self.invalidate(config)
+        return await super().aput_writes(config, *args, **kwargs)
+
+    async def aput_with_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self.invalidate(config)
+        return await super().aput_with_writes(config, *args, **kwargs)
+
+    async def adelete_thread(self, thread_id: str, actor_id: str = "") -> None:
+        self._invalidate_thread(thread_id, actor_id)
+        return await super().adelete_thread(thread_id, actor_id)
+
+    def put(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self.invalidate(config)
+        return super().put(config, *args, **kwargs)
+
+    def put_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> None:
+        self.invalidate(config)
+        return super().put_writes(config, *args, **kwargs)
+
+    def put_with_writes(self, config: RunnableConfig, *args: Any, **kwargs: Any) -> RunnableConfig:
+        self.invalidate(config)
+        return super().put_with_writes(config, *args, **kwargs)
+
+    def delete_thread(self, thread_id: str, actor_id: str = "") -> None:
+        self._invalidate_thread(thread_id, actor_id)
+        return super().delete_thread(thread_id, actor_id)
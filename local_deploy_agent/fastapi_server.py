@@ -5,20 +5,37 @@ Run with: uvicorn fastapi_server:app --reload --timeout-keep-alive 120
 
 For production, configure appropriate timeouts:
     uvicorn fastapi_server:app --host 0.0.0.0 --port 8000 --timeout-keep-alive 120
+
+With uvicorn[standard] installed, uvicorn runs on uvloop and httptools by
+default (or pass --loop uvloop --http httptools to require them).
 """
 
 import asyncio
+import json
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field, field_validator
-from langchain_aws import ChatBedrock
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
+
+from agent_factory import get_agent, get_client, get_llm, prewarm
+from stream_utils import AGENT_NODE
+
+# Use google-re2 for the prompt pattern scan when it is installed: it matches in
+# linear time, so no crafted prompt can make validation backtrack. The patterns
+# below stick to syntax both engines accept.
+try:
+    import re2 as pattern_engine
+except ImportError:
+    pattern_engine = re
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +53,22 @@ MAX_PROMPT_LENGTH = 10000  # Maximum characters in prompt
 MIN_PROMPT_LENGTH = 1      # Minimum characters in prompt
 STREAMING_TIMEOUT_SECONDS = 120  # Timeout for streaming responses
 
+# ChatBedrock's boto3 calls are blocking, so LangGraph runs them on the event
+# loop's default executor. Its default size (min(32, cpu_count + 4)) would cap
+# how many model calls are in flight at once; match the boto3 pool size instead.
+EXECUTOR_MAX_WORKERS = 50
+
+# Streamed text is batched into one SSE event once it reaches this many
+# characters or has been held this long (seconds), whichever comes first
+SSE_BATCH_CHARS = 64
+SSE_BATCH_INTERVAL = 0.02
+
+# SSE frames are yielded as UTF-8 bytes, which StreamingResponse sends as is
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
+SSE_DONE = b"data: [DONE]\n\n"
+SSE_ERROR = b"data: [ERROR] An error occurred\n\n"
+
 # Patterns that might indicate prompt injection attempts
 SUSPICIOUS_PATTERNS = [
     r"ignore\s+(all\s+)?(previous|prior|above)\s+(instructions?|prompts?)",
@@ -45,6 +78,23 @@ SUSPICIOUS_PATTERNS = [
     r"system\s*:\s*",
 ]
 
+# All patterns as one precompiled alternation: the prompt is scanned once per
+# request, case-insensitively (the inline (?i) flag works in re and re2),
+# without lowercasing a copy of it first
+SUSPICIOUS_PATTERN_RE = pattern_engine.compile(
+    "(?i)" + "|".join(f"(?:{pattern})" for pattern in SUSPICIOUS_PATTERNS)
+)
+
+# Words at least one of which every suspicious pattern contains. Substring
+# checks on the lowercased prompt are far cheaper than the regex, so benign
+# prompts without any of them skip the regex scan entirely. The prefilter only
+# runs on ASCII prompts: there lowercasing matches exactly what the (?i) regex
+# treats as equal, so it can never hide a match. Unicode case-insensitive
+# matching also equates some non-ASCII letters with ASCII ones (e.g. 'İ' with
+# 'i', 'ſ' with 's') in ways no str case mapping reproduces, so other prompts
+# always go to the regex.
+SUSPICIOUS_KEYWORDS = ("ignore", "disregard", "you", "instruction", "system")
+
 SYSTEM_PROMPT = """You are a helpful assistant that can answer questions and use tools.
 Be concise and helpful in your responses."""
 
@@ -71,25 +121,35 @@ tools = [get_weather, search_knowledge_base]
 # LLM AND AGENT SETUP
 # =============================================================================
 
-llm = ChatBedrock(
-    model_id=MODEL_ID,
-    region_name=REGION,
-)
+# get_llm() builds the LLM once per process on the shared, pooled bedrock-runtime
+# client (see agent_factory), so concurrent requests don't queue for connections
+llm = get_llm(MODEL_ID, REGION)
 
-agent = create_react_agent(
-    model=llm,
-    tools=tools,
-    prompt=SYSTEM_PROMPT,
-)
+agent = get_agent(llm, tools, SYSTEM_PROMPT)
 
 # =============================================================================
 # FASTAPI APP
 # =============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the default executor and open the Bedrock connection before the first request."""
+    executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="bedrock")
+    asyncio.get_running_loop().set_default_executor(executor)
+    # The agent graph is compiled once at import (get_agent caches it); this only
+    # takes the TCP + TLS handshake and credential lookup off the first request
+    prewarm({
+        "bedrock-runtime": lambda: get_client("bedrock-runtime", REGION).list_async_invokes(maxResults=1),
+    })
+    yield
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
 app = FastAPI(
     title="AgentCore Demo API",
     description="LangGraph + Bedrock AgentCore streaming API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS - restrict in production
@@ -120,16 +180,21 @@ def check_suspicious_patterns(text: str) -> bool:
     Returns:
         True if suspicious patterns are found
     """
-    text_lower = text.lower()
-    for pattern in SUSPICIOUS_PATTERNS:
-        if re.search(pattern, text_lower):
-            return True
-    return False
+    # str.isascii() is a constant-time flag check in CPython
+    if text.isascii():
+        lowered = text.lower()
+        if not any(keyword in lowered for keyword in SUSPICIOUS_KEYWORDS):
+            return False
+    return SUSPICIOUS_PATTERN_RE.search(text) is not None
 
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint with validation."""
     
+    # Whitespace is stripped by pydantic-core before the length limits are
+    # checked, so a blank prompt fails min_length without a Python validator
+    model_config = ConfigDict(str_strip_whitespace=True, frozen=True)
+    
     prompt: str = Field(
         ...,
         min_length=MIN_PROMPT_LENGTH,
@@ -145,16 +210,7 @@ class ChatRequest(BaseModel):
     @field_validator("prompt")
     @classmethod
     def validate_prompt(cls, v: str) -> str:
-        """Validate and sanitize the prompt."""
-        # Strip leading/trailing whitespace
-        v = v.strip()
-        
-        # Check minimum length after stripping
-        if len(v) < MIN_PROMPT_LENGTH:
-            raise ValueError(
-                f"Prompt must be at least {MIN_PROMPT_LENGTH} character(s) after trimming whitespace"
-            )
-        
+        """Validate the (already stripped and length-checked) prompt."""
         # Check for null bytes (potential injection)
         if "\x00" in v:
             raise ValueError("Prompt contains invalid characters")
@@ -176,7 +232,7 @@ class ChatRequest(BaseModel):
 async def generate_stream_with_timeout(
     prompt: str,
     timeout: float = STREAMING_TIMEOUT_SECONDS,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Generate streaming response with timeout protection.
     
@@ -185,52 +241,86 @@ async def generate_stream_with_timeout(
         timeout: Maximum time in seconds for the entire stream
         
     Yields:
-        SSE-formatted response chunks
+        SSE-formatted response chunks, as UTF-8 bytes
     """
-    input_data = {"messages": [{"role": "user", "content": prompt}]}
-    
-    async def _stream():
-        async for event in agent.astream(input_data, stream_mode="messages"):
-            if isinstance(event, tuple) and len(event) >= 2:
-                chunk, metadata = event[0], event[1]
-                # Only yield AI model text responses from the 'agent' node
-                # Skip tool calls and tool results
-                # Note: create_react_agent uses 'agent' as the node name, not 'model'
-                if metadata.get("langgraph_node") != "agent":
-                    continue
-                if hasattr(chunk, "content") and chunk.content:
-                    content = chunk.content
-                    if isinstance(content, list):
-                        for block in content:
-                            # Only yield text blocks, skip tool_use blocks
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                text = block.get("text", "")
-                                if text:
-                                    yield f"data: {text}\n\n"
-                    elif isinstance(content, str) and content:
-                        yield f"data: {content}\n\n"
-        
-        yield "data: [DONE]\n\n"
+    input_data = {"messages": [HumanMessage(content=prompt)]}
     
+    # The agent stream is consumed directly here rather than through an inner
+    # generator, so each SSE chunk costs one generator round trip, not two.
+    # Model tokens are a few characters each, so they are batched into larger
+    # SSE events: every event is a separate send through the ASGI server.
+    buf: list[str] = []
+    buf_len = 0
+    last_flush = 0.0  # The first text goes out as soon as it arrives
+    # This loop runs once per token: the same cheap checks as stream_utils.iter_text
+    agent_node = AGENT_NODE
+    _str, _list, _dict = str, list, dict
+    # The timeout is a deadline for the whole stream, enforced on every wait for
+    # the next event. The time spent sending chunks to the client is not waited
+    # on here, so a slow reader can't trip it, but a stalled model call can.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    events = agent.astream(input_data, stream_mode="messages")
     try:
-        # Wrap the stream with a timeout
-        stream_task = _stream()
-        async for chunk in stream_task:
-            # Check timeout for each chunk
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
             try:
-                yield chunk
-            except asyncio.CancelledError:
-                logger.warning("Stream cancelled by client")
-                return
-                
+                chunk, metadata = await asyncio.wait_for(events.__anext__(), remaining)
+            except StopAsyncIteration:
+                break
+            # Only yield AI model text responses from the 'agent' node
+            # Skip tool calls and tool results
+            if metadata.get("langgraph_node") != agent_node:
+                # The model is waiting on a tool, so send what it has said so far
+                if buf:
+                    yield SSE_PREFIX + "".join(buf).encode() + SSE_SUFFIX
+                    buf.clear()
+                    buf_len = 0
+                    last_flush = time.monotonic()
+                continue
+            content = getattr(chunk, "content", None)
+            if not content:
+                continue
+            content_type = type(content)
+            if content_type is _str:
+                buf.append(content)
+                buf_len += len(content)
+            elif content_type is _list:
+                for block in content:
+                    # Only yield text blocks, skip tool_use blocks
+                    if type(block) is _dict and block.get("type") == "text":
+                        if text := block.get("text"):
+                            buf.append(text)
+                            buf_len += len(text)
+            now = time.monotonic()
+            if buf and (buf_len >= SSE_BATCH_CHARS or now - last_flush >= SSE_BATCH_INTERVAL):
+                yield SSE_PREFIX + "".join(buf).encode() + SSE_SUFFIX
+                buf.clear()
+                buf_len = 0
+                last_flush = now
+        
+        if buf:
+            yield SSE_PREFIX + "".join(buf).encode() + SSE_SUFFIX
+        yield SSE_DONE
+    
+    except asyncio.CancelledError:
+        logger.warning("Stream cancelled by client")
+        return
     except asyncio.TimeoutError:
         logger.error(f"Streaming response timed out after {timeout}s")
-        yield f"data: [ERROR] Response timed out after {timeout} seconds\n\n"
-        yield "data: [DONE]\n\n"
+        if buf:
+            yield SSE_PREFIX + "".join(buf).encode() + SSE_SUFFIX
+        yield f"data: [ERROR] Response timed out after {timeout} seconds\n\n".encode()
+        yield SSE_DONE
     except Exception as e:
         logger.error(f"Error during streaming: {e}")
-        yield "data: [ERROR] An error occurred\n\n"
-        yield "data: [DONE]\n\n"
+        yield SSE_ERROR
+        yield SSE_DONE
+    finally:
+        # Stops the agent run (and its Bedrock stream) on timeout or disconnect
+        await events.aclose()
 
 
 # =============================================================================
@@ -260,7 +350,7 @@ async def chat(request: ChatRequest):
         else:
             # Non-streaming with timeout
             try:
-                input_data = {"messages": [{"role": "user", "content": request.prompt}]}
+                input_data = {"messages": [HumanMessage(content=request.prompt)]}
                 result = await asyncio.wait_for(
                     agent.ainvoke(input_data),
                     timeout=STREAMING_TIMEOUT_SECONDS,
@@ -281,17 +371,23 @@ async def chat(request: ChatRequest):
         )
 
 
+# Both bodies are constant, so they are serialized once here instead of going
+# through FastAPI's response encoding on every (load balancer) request
+HEALTH_BODY = json.dumps({"status": "ok"}).encode()
+CONFIG_BODY = json.dumps({
+    "max_prompt_length": MAX_PROMPT_LENGTH,
+    "min_prompt_length": MIN_PROMPT_LENGTH,
+    "streaming_timeout_seconds": STREAMING_TIMEOUT_SECONDS,
+}).encode()
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "ok"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/config")
 async def config():
     """Return current configuration limits (for client reference)."""
-    return {
-        "max_prompt_length": MAX_PROMPT_LENGTH,
-        "min_prompt_length": MIN_PROMPT_LENGTH,
-        "streaming_timeout_seconds": STREAMING_TIMEOUT_SECONDS,
-    }
+    return Response(content=CONFIG_BODY, media_type="application/json")
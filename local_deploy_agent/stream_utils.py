@@ -0,0 +1,126 @@
+"""
+Streaming helpers shared by the local agents.
+
+LangGraph's stream_mode="messages" yields (chunk, metadata) tuples for every
+token. Only text from the model node is shown to the user; tool calls and
+tool results are skipped.
+
+astream_events(version="v2") is not used instead: it builds an event dict for
+the start, stream and end of every runnable in the graph (nodes, prompt, model,
+tools, parsers), so filtering for on_chat_model_stream costs more per token
+than the node check here. The tools node adds one event per tool result, not
+per token, so it is filtered here rather than hidden at the graph level (the
+only switch for that, the langsmith:hidden tag, also hides it from traces).
+
+The CLI helpers at the bottom read user input without blocking the event loop
+and write streamed tokens to the terminal with batched flushes.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from typing import Any, AsyncGenerator, AsyncIterable, AsyncIterator
+
+# create_react_agent names its model node 'agent', not 'model'
+AGENT_NODE = "agent"
+
+
+async def iter_text(events: AsyncIterator[Any]) -> AsyncGenerator[str, None]:
+    """
+    Yield the model's text from an agent.astream(..., stream_mode="messages") stream.
+
+    This loop runs once per streamed token, so it sticks to cheap checks: exact
+    type() comparisons instead of isinstance(), and a single attribute lookup
+    for the chunk content. The string keys need no sys.intern(): identifier-like
+    literals are interned by the compiler and str caches its hash, so each dict
+    lookup is a hash read plus, on a hit, an identity comparison.
+
+    Args:
+        events: The async iterator returned by agent.astream
+
+    Yields:
+        str: Text fragments from the 'agent' node, in order
+    """
+    agent_node = AGENT_NODE
+    _str, _list, _dict = str, list, dict
+    async for event in events:
+        try:
+            chunk, metadata = event
+        except (TypeError, ValueError):
+            continue
+        if metadata.get("langgraph_node") != agent_node:
+            continue
+        content = getattr(chunk, "content", None)
+        if not content:
+            continue
+        content_type = type(content)
+        if content_type is _str:
+            yield content
+        elif content_type is _list:
+            # Bedrock's content block format: only yield text blocks, skip tool_use blocks
+            for block in content:
+                if type(block) is _dict and block.get("type") == "text":
+                    if text := block.get("text"):
+                        yield text
+
+
+# Streamed CLI output is flushed to the terminal at most this often (seconds)
+STREAM_FLUSH_INTERVAL = 0.016
+
+
+async def ainput(prompt: str = "") -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+    
+    input() runs on a daemon thread, so background work (prefetches, pooled
+    connection keepalives) keeps running while the user types. A daemon thread
+    is used rather than asyncio.to_thread: the default executor is joined when
+    asyncio.run() exits, and a thread stuck in input() would hang Ctrl+C.
+    
+    Raises:
+        EOFError: If stdin is closed (Ctrl+D)
+    """
+    # Piped input is already there, so there is nothing to wait for. It also goes
+    # through stdin's buffer lock, which a daemon thread still blocked in input()
+    # would hold at interpreter shutdown (a fatal error); terminal input doesn't.
+    if not sys.stdin.isatty():
+        return input(prompt)
+    
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(method, value) -> None:
+        if not future.done():
+            method(value)
+    
+    def read() -> None:
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(settle, future.set_result, line)
+    
+    threading.Thread(target=read, name="ainput", daemon=True).start()
+    return await future
+
+
+async def write_stream(tokens: AsyncIterable[str]) -> None:
+    """
+    Write streamed tokens to stdout, flushing at most every STREAM_FLUSH_INTERVAL.
+    
+    Flushing per token costs a write syscall per token; batching them keeps the
+    output smooth to the eye with far fewer writes. Always flushes at the end.
+    """
+    write, flush = sys.stdout.write, sys.stdout.flush
+    last_flush = time.monotonic()
+    try:
+        async for token in tokens:
+            write(token)
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_INTERVAL:
+                flush()
+                last_flush = now
+    finally:
+        flush()
@@ -10,7 +10,11 @@ This module provides reusable components for:
 """
 
 from shared.config import AgentConfig, load_config
-from shared.guardrails import build_guardrails_config, handle_guardrails_error
+from shared.guardrails import (
+    GUARDRAILS_INTERVENTION_MESSAGE,
+    build_guardrails_config,
+    handle_guardrails_error,
+)
 from shared.retry import with_retry, RetryConfig
 
 # Lazy imports for modules that require optional dependencies
@@ -29,6 +33,7 @@ __all__ = [
     "load_config",
     "create_knowledge_base_tool",
     "build_guardrails_config",
+    "GUARDRAILS_INTERVENTION_MESSAGE",
     "handle_guardrails_error",
     "initialize_memory",
     "with_retry",
@@ -5,17 +5,30 @@ This module provides type-safe configuration loading and validation
 for all Bedrock Agents features (GuardRails, Knowledge Base, Memory).
 """
 
+import functools
 import os
 import logging
+import re
+import sys
 from typing import Optional
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 logger = logging.getLogger(__name__)
 
+# Resource IDs are at least 5 characters with no whitespace. Real AWS IDs have
+# no common prefix (GuardRail IDs are bare, Memory IDs start with the memory's
+# name), so only the shape is checked, in one precompiled match.
+ID_PATTERN = re.compile(r"\S{5,}")
+
 
 class GuardRailsConfig(BaseModel):
     """Configuration for AWS Bedrock GuardRails."""
     
+    # Frozen: configs are read-only once loaded, which also makes them hashable
+    # (usable as cache keys). The validation schema is built on first use, not
+    # at import.
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     guardrail_id: Optional[str] = Field(
         default=None,
         description="GuardRail resource ID from AWS Console"
@@ -31,7 +44,9 @@ class GuardRailsConfig(BaseModel):
         """Convert empty strings to None."""
         if v is None or (isinstance(v, str) and not v.strip()):
             return None
-        return v.strip()
+        # IDs are interned: the same ID is threaded through tool closures,
+        # retriever settings and logs, and interned copies compare by identity
+        return sys.intern(v.strip())
     
     @model_validator(mode="after")
     def validate_version_when_id_present(self) -> "GuardRailsConfig":
@@ -41,10 +56,10 @@ class GuardRailsConfig(BaseModel):
                 "GuardRail version is required when GuardRail ID is set. "
                 "Set BEDROCK_GUARDRAIL_VERSION to a version number or 'DRAFT'."
             )
-        if self.guardrail_id and len(self.guardrail_id) < 5:
+        if self.guardrail_id and not ID_PATTERN.fullmatch(self.guardrail_id):
             raise ValueError(
                 f"Invalid GuardRail ID format: '{self.guardrail_id}'. "
-                "GuardRail IDs should be longer than 5 characters."
+                "GuardRail IDs should be at least 5 characters with no spaces."
             )
         return self
     
@@ -57,6 +72,8 @@ class GuardRailsConfig(BaseModel):
 class KnowledgeBaseConfig(BaseModel):
     """Configuration for AWS Bedrock Knowledge Base."""
     
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     knowledge_base_id: Optional[str] = Field(
         default=None,
         description="Knowledge Base resource ID from AWS Console"
@@ -74,15 +91,15 @@ class KnowledgeBaseConfig(BaseModel):
         """Convert empty strings to None."""
         if v is None or (isinstance(v, str) and not v.strip()):
             return None
-        return v.strip()
+        return sys.intern(v.strip())
     
     @model_validator(mode="after")
     def validate_id_format(self) -> "KnowledgeBaseConfig":
         """Validate Knowledge Base ID format."""
-        if self.knowledge_base_id and len(self.knowledge_base_id) < 5:
+        if self.knowledge_base_id and not ID_PATTERN.fullmatch(self.knowledge_base_id):
             raise ValueError(
                 f"Invalid Knowledge Base ID format: '{self.knowledge_base_id}'. "
-                "Knowledge Base IDs should be longer than 5 characters."
+                "Knowledge Base IDs should be at least 5 characters with no spaces."
             )
         return self
     
@@ -95,6 +112,8 @@ class KnowledgeBaseConfig(BaseModel):
 class MemoryConfig(BaseModel):
     """Configuration for AWS Bedrock AgentCore Memory."""
     
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     memory_id: Optional[str] = Field(
         default=None,
         description="Memory resource ID from AWS Console"
@@ -106,15 +125,15 @@ class MemoryConfig(BaseModel):
         """Convert empty strings to None."""
         if v is None or (isinstance(v, str) and not v.strip()):
             return None
-        return v.strip()
+        return sys.intern(v.strip())
     
     @model_validator(mode="after")
     def validate_id_format(self) -> "MemoryConfig":
         """Validate Memory ID format."""
-        if self.memory_id and len(self.memory_id) < 5:
+        if self.memory_id and not ID_PATTERN.fullmatch(self.memory_id):
             raise ValueError(
                 f"Invalid Memory ID format: '{self.memory_id}'. "
-                "Memory IDs should be longer than 5 characters."
+                "Memory IDs should be at least 5 characters with no spaces."
             )
         return self
     
@@ -127,6 +146,8 @@ class MemoryConfig(BaseModel):
 class AgentConfig(BaseModel):
     """Complete agent configuration with all features."""
     
+    model_config = ConfigDict(frozen=True, defer_build=True)
+    
     # AWS Configuration
     region: str = Field(default="us-east-1", description="AWS region")
     model_id: str = Field(
@@ -147,36 +168,108 @@ class AgentConfig(BaseModel):
     
     def log_status(self) -> None:
         """Log the configuration status for all features."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
         logger.info("=" * 60)
         logger.info("Bedrock Agents Feature Status:")
-        logger.info(f"  Region: {self.region}")
-        logger.info(f"  Model: {self.model_id}")
-        logger.info(f"  GuardRails: {'ENABLED' if self.guardrails.enabled else 'DISABLED'}")
+        logger.info("  Region: %s", self.region)
+        logger.info("  Model: %s", self.model_id)
+        logger.info("  GuardRails: %s", "ENABLED" if self.guardrails.enabled else "DISABLED")
         if self.guardrails.enabled:
-            logger.info(f"    - ID: {self.guardrails.guardrail_id}")
-            logger.info(f"    - Version: {self.guardrails.guardrail_version}")
-        logger.info(f"  Knowledge Base: {'ENABLED' if self.knowledge_base.enabled else 'DISABLED'}")
+            logger.info("    - ID: %s", self.guardrails.guardrail_id)
+            logger.info("    - Version: %s", self.guardrails.guardrail_version)
+        logger.info("  Knowledge Base: %s", "ENABLED" if self.knowledge_base.enabled else "DISABLED")
         if self.knowledge_base.enabled:
-            logger.info(f"    - ID: {self.knowledge_base.knowledge_base_id}")
-            logger.info(f"    - Results: {self.knowledge_base.num_results}")
-        logger.info(f"  Memory: {'ENABLED' if self.memory.enabled else 'DISABLED'}")
+            logger.info("    - ID: %s", self.knowledge_base.knowledge_base_id)
+            logger.info("    - Results: %s", self.knowledge_base.num_results)
+        logger.info("  Memory: %s", "ENABLED" if self.memory.enabled else "DISABLED")
         if self.memory.enabled:
-            logger.info(f"    - ID: {self.memory.memory_id}")
+            logger.info("    - ID: %s", self.memory.memory_id)
         logger.info("=" * 60)
 
 
+def _normalize(v: Optional[str]) -> Optional[str]:
+    """Apply the models' empty_string_to_none rule: strip, and map blank to None."""
+    if v is None:
+        return None
+    v = v.strip()
+    return sys.intern(v) if v else None
+
+
+@functools.lru_cache(maxsize=8)
+def _build_config(
+    region: str,
+    model_id: str,
+    system_prompt: str,
+    guardrail_id: Optional[str],
+    guardrail_version: str,
+    knowledge_base_id: Optional[str],
+    kb_num_results: str,
+    memory_id: Optional[str],
+    validate: bool = True,
+) -> AgentConfig:
+    """Build an AgentConfig; cached per distinct set of inputs."""
+    if not validate:
+        # model_construct() skips field and model validators entirely, so the
+        # ID normalization they would do is applied here instead
+        return AgentConfig.model_construct(
+            region=region,
+            model_id=model_id,
+            system_prompt=system_prompt,
+            guardrails=GuardRailsConfig.model_construct(
+                guardrail_id=_normalize(guardrail_id),
+                guardrail_version=guardrail_version,
+            ),
+            knowledge_base=KnowledgeBaseConfig.model_construct(
+                knowledge_base_id=_normalize(knowledge_base_id),
+                num_results=int(kb_num_results),
+            ),
+            memory=MemoryConfig.model_construct(
+                memory_id=_normalize(memory_id),
+            ),
+        )
+    return AgentConfig(
+        region=region,
+        model_id=model_id,
+        system_prompt=system_prompt,
+        guardrails=GuardRailsConfig(
+            guardrail_id=guardrail_id,
+            guardrail_version=guardrail_version,
+        ),
+        knowledge_base=KnowledgeBaseConfig(
+            knowledge_base_id=knowledge_base_id,
+            num_results=int(kb_num_results),
+        ),
+        memory=MemoryConfig(
+            memory_id=memory_id,
+        ),
+    )
+
+
 def load_config(
     region: Optional[str] = None,
     model_id: Optional[str] = None,
     system_prompt: Optional[str] = None,
+    validate: bool = True,
 ) -> AgentConfig:
     """
     Load agent configuration from environment variables.
     
+    The validated config is cached on the values it was built from (overrides
+    plus the relevant environment variables), so repeated calls with the same
+    environment return the same object without re-running validation, and a
+    changed environment variable yields a fresh config. The config models are
+    frozen, so sharing them is safe; load_config.cache_clear() empties the
+    cache.
+    
     Args:
         region: Override AWS region (default: from env or us-east-1)
         model_id: Override model ID (default: from env or Claude Sonnet 4.5)
         system_prompt: Override system prompt
+        validate: Run the Pydantic validators (default). Pass False to build
+            the models with model_construct() when the environment is known
+            to be well formed; IDs are still stripped and blanks mapped to
+            None, but format and range checks are skipped.
         
     Returns:
         AgentConfig: Validated configuration object
@@ -184,22 +277,22 @@ def load_config(
     Raises:
         ValueError: If configuration is invalid
     """
-    return AgentConfig(
-        region=region or os.getenv("AWS_REGION", "us-east-1"),
-        model_id=model_id or os.getenv(
+    # os.getenv() re-resolves os.environ on every call; bind the mapping once
+    env = os.environ
+    return _build_config(
+        region or env.get("AWS_REGION", "us-east-1"),
+        model_id or env.get(
             "BEDROCK_MODEL_ID",
             "us.anthropic.claude-sonnet-4-5-20250929-v1:0"
         ),
-        system_prompt=system_prompt or "You are a helpful assistant.",
-        guardrails=GuardRailsConfig(
-            guardrail_id=os.getenv("BEDROCK_GUARDRAIL_ID"),
-            guardrail_version=os.getenv("BEDROCK_GUARDRAIL_VERSION", "DRAFT"),
-        ),
-        knowledge_base=KnowledgeBaseConfig(
-            knowledge_base_id=os.getenv("BEDROCK_KNOWLEDGE_BASE_ID"),
-            num_results=int(os.getenv("BEDROCK_KB_NUM_RESULTS", "5")),
-        ),
-        memory=MemoryConfig(
-            memory_id=os.getenv("BEDROCK_MEMORY_ID"),
-        ),
+        system_prompt or "You are a helpful assistant.",
+        env.get("BEDROCK_GUARDRAIL_ID"),
+        env.get("BEDROCK_GUARDRAIL_VERSION", "DRAFT"),
+        env.get("BEDROCK_KNOWLEDGE_BASE_ID"),
+        env.get("BEDROCK_KB_NUM_RESULTS", "5"),
+        env.get("BEDROCK_MEMORY_ID"),
+        validate,
     )
+
+
+load_config.cache_clear = _build_config.cache_clear
@@ -5,8 +5,12 @@ This module provides utilities for configuring AWS Bedrock GuardRails
 and handling GuardRails intervention errors.
 """
 
+import functools
 import logging
-from typing import Optional
+import re
+import sys
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from shared.config import GuardRailsConfig
 
@@ -21,41 +25,65 @@ GUARDRAILS_ERROR_KEYWORDS = frozenset([
     "content filter",
 ])
 
-# User-friendly message for GuardRails interventions
-GUARDRAILS_INTERVENTION_MESSAGE = (
+# All keywords as one case-insensitive alternation, so an error message is
+# searched in a single pass without first making a lowercased copy of it.
+# Multi-word keywords also match across line breaks or repeated spaces.
+GUARDRAILS_ERROR_PATTERN = re.compile(
+    "|".join(
+        re.escape(keyword).replace(r"\ ", r"\s+")
+        for keyword in sorted(GUARDRAILS_ERROR_KEYWORDS)
+    ),
+    re.IGNORECASE,
+)
+
+# User-friendly message for GuardRails interventions. Interned, so every
+# caller shares one object and comparisons against it can match by identity.
+GUARDRAILS_INTERVENTION_MESSAGE = sys.intern(
     "I apologize, but I cannot provide that response as it violates "
     "content safety policies. Please rephrase your request or ask "
     "something different."
 )
 
 
-def build_guardrails_config(config: GuardRailsConfig) -> Optional[dict]:
+@functools.lru_cache(maxsize=8)
+def _build_guardrails_mapping(
+    guardrail_id: str,
+    guardrail_version: str,
+) -> Mapping[str, str]:
+    """Build the read-only ChatBedrock GuardRails mapping for an ID and version."""
+    logger.info(
+        "GuardRails config: Built (ID: %s, Version: %s)",
+        guardrail_id, guardrail_version,
+    )
+    return MappingProxyType({
+        "guardrailIdentifier": guardrail_id,
+        "guardrailVersion": guardrail_version,
+        "trace": "enabled",
+    })
+
+
+def build_guardrails_config(config: GuardRailsConfig) -> Optional[Mapping[str, str]]:
     """
     Build GuardRails configuration for ChatBedrock.
     
     GuardRails are configured at the LLM level and automatically filter
     both user inputs and model outputs.
     
+    Results are cached per (GuardRail ID, version) and returned as a shared
+    read-only mapping, so repeated agent construction allocates nothing.
+    Copy it with dict() if a mutable dict is needed.
+    
     Args:
         config: GuardRails configuration
         
     Returns:
-        GuardRails configuration dict for ChatBedrock, or None if disabled
+        GuardRails configuration mapping for ChatBedrock, or None if disabled
     """
     if not config.enabled:
         logger.info("GuardRails config: Not configured (feature disabled)")
         return None
     
-    logger.info(
-        f"GuardRails config: Built "
-        f"(ID: {config.guardrail_id}, Version: {config.guardrail_version})"
-    )
-    
-    return {
-        "guardrailIdentifier": config.guardrail_id,
-        "guardrailVersion": config.guardrail_version,
-        "trace": "enabled",
-    }
+    return _build_guardrails_mapping(config.guardrail_id, config.guardrail_version)
 
 
 def is_guardrails_error(error: Exception) -> bool:
@@ -68,8 +96,7 @@ def is_guardrails_error(error: Exception) -> bool:
     Returns:
         True if this is a GuardRails intervention
     """
-    error_msg = str(error).lower()
-    return any(keyword in error_msg for keyword in GUARDRAILS_ERROR_KEYWORDS)
+    return GUARDRAILS_ERROR_PATTERN.search(str(error)) is not None
 
 
 def handle_guardrails_error(
@@ -90,15 +117,16 @@ def handle_guardrails_error(
     Returns:
         User-friendly error message
     """
-    log_parts = ["GuardRails intervention occurred."]
-    
-    if guardrail_id:
-        log_parts.append(f"GuardRail ID: {guardrail_id}")
-    
-    if prompt_preview:
-        log_parts.append(f"Prompt preview: {prompt_preview[:100]}...")
-    
-    logger.warning(" ".join(log_parts))
+    if logger.isEnabledFor(logging.WARNING):
+        log_parts = ["GuardRails intervention occurred."]
+        
+        if guardrail_id:
+            log_parts.append(f"GuardRail ID: {guardrail_id}")
+        
+        if prompt_preview:
+            log_parts.append(f"Prompt preview: {prompt_preview[:100]}...")
+        
+        logger.warning(" ".join(log_parts))
     
     return GUARDRAILS_INTERVENTION_MESSAGE
 
@@ -107,6 +135,9 @@ def get_guardrails_intervention_message() -> str:
     """
     Get the standard GuardRails intervention message.
     
+    Kept for compatibility; new code can use GUARDRAILS_INTERVENTION_MESSAGE
+    (also exported from shared) directly.
+    
     Returns:
         User-friendly intervention message
     """
@@ -5,6 +5,7 @@ This module provides a factory function for creating Knowledge Base
 query tools with proper error handling and retry logic.
 """
 
+import functools
 import logging
 from typing import Callable, Optional, TYPE_CHECKING
 
@@ -19,19 +20,100 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=1)
+def _retriever_cls() -> type["AmazonKnowledgeBasesRetriever"]:
+    """
+    Return AmazonKnowledgeBasesRetriever, importing langchain_aws on first use.
+    
+    The import is deferred so langchain_aws is not required at module load
+    time, and cached so later tools and queries skip the import machinery.
+    """
+    from langchain_aws import AmazonKnowledgeBasesRetriever
+    return AmazonKnowledgeBasesRetriever
+
+
 # Retry configuration for Knowledge Base operations
 KB_RETRY_CONFIG = RetryConfig(
     max_attempts=3,
     base_delay=1.0,
     max_delay=10.0,
-    retryable_errors={
+    retryable_errors=frozenset({
         "ThrottlingException",
         "ServiceUnavailableException",
         "InternalServerException",
-    },
+    }),
 )
 
 
+def _handle_not_found(
+    error: ClientError, error_code: str, kb_id: str, region: str, query: str
+) -> str:
+    logger.error(
+        "Knowledge Base not found. ID: %s, Region: %s", kb_id, region
+    )
+    return (
+        f"Knowledge Base not found (ID: {kb_id}).\n"
+        "Please verify:\n"
+        "1. The Knowledge Base ID is correct\n"
+        "2. The Knowledge Base exists in the AWS Bedrock Console\n"
+        f"3. The Knowledge Base is in the {region} region\n"
+        "4. Your IAM permissions allow access"
+    )
+
+
+def _handle_validation(
+    error: ClientError, error_code: str, kb_id: str, region: str, query: str
+) -> str:
+    logger.error(
+        "Knowledge Base query validation failed. ID: %s, Query: %.50s..., Error: %s",
+        kb_id, query, error,
+    )
+    return (
+        f"Invalid query format: {error}\n"
+        "Please ensure the query is valid text and not too long."
+    )
+
+
+def _handle_access_denied(
+    error: ClientError, error_code: str, kb_id: str, region: str, query: str
+) -> str:
+    logger.error("Access denied to Knowledge Base. ID: %s", kb_id)
+    return (
+        "Access denied to Knowledge Base.\n"
+        "Please verify your IAM permissions include:\n"
+        "- bedrock:Retrieve on the Knowledge Base resource"
+    )
+
+
+def _handle_throttled(
+    error: ClientError, error_code: str, kb_id: str, region: str, query: str
+) -> str:
+    logger.warning("Knowledge Base query throttled. ID: %s", kb_id)
+    return (
+        "Knowledge Base query was throttled due to rate limits.\n"
+        "Please try again in a moment."
+    )
+
+
+def _handle_service_error(
+    error: ClientError, error_code: str, kb_id: str, region: str, query: str
+) -> str:
+    logger.error(
+        "Knowledge Base AWS error. Code: %s, Error: %s", error_code, error
+    )
+    return f"Knowledge Base service error: {error_code}\nDetails: {error}"
+
+
+# ClientError code -> message handler; other codes use _handle_service_error
+_KB_ERROR_HANDLERS = {
+    "ResourceNotFoundException": _handle_not_found,
+    "ValidationException": _handle_validation,
+    "AccessDeniedException": _handle_access_denied,
+    "ThrottlingException": _handle_throttled,
+}
+
+
 def format_kb_error(
     error: Exception,
     kb_id: str,
@@ -51,54 +133,16 @@ def format_kb_error(
         User-friendly error message
     """
     if isinstance(error, ClientError):
-        error_code = error.response.get("Error", {}).get("Code", "")
-        
-        if error_code == "ResourceNotFoundException":
-            logger.error(
-                f"Knowledge Base not found. ID: {kb_id}, Region: {region}"
-            )
-            return (
-                f"Knowledge Base not found (ID: {kb_id}).\n"
-                "Please verify:\n"
-                "1. The Knowledge Base ID is correct\n"
-                "2. The Knowledge Base exists in the AWS Bedrock Console\n"
-                f"3. The Knowledge Base is in the {region} region\n"
-                "4. Your IAM permissions allow access"
-            )
-        
-        elif error_code == "ValidationException":
-            logger.error(
-                f"Knowledge Base query validation failed. "
-                f"ID: {kb_id}, Query: {query[:50]}..., Error: {error}"
-            )
-            return (
-                f"Invalid query format: {error}\n"
-                "Please ensure the query is valid text and not too long."
-            )
-        
-        elif error_code == "AccessDeniedException":
-            logger.error(f"Access denied to Knowledge Base. ID: {kb_id}")
-            return (
-                "Access denied to Knowledge Base.\n"
-                "Please verify your IAM permissions include:\n"
-                "- bedrock:Retrieve on the Knowledge Base resource"
-            )
-        
-        elif error_code == "ThrottlingException":
-            logger.warning(f"Knowledge Base query throttled. ID: {kb_id}")
-            return (
-                "Knowledge Base query was throttled due to rate limits.\n"
-                "Please try again in a moment."
-            )
-        
-        else:
-            logger.error(
-                f"Knowledge Base AWS error. Code: {error_code}, Error: {error}"
-            )
-            return f"Knowledge Base service error: {error_code}\nDetails: {error}"
+        # Indexed like is_retryable(), without building default dicts
+        try:
+            error_code = error.response["Error"]["Code"]
+        except (KeyError, TypeError):
+            error_code = ""
+        handler = _KB_ERROR_HANDLERS.get(error_code, _handle_service_error)
+        return handler(error, error_code, kb_id, region, query)
     
     # General exception
-    logger.error(f"Unexpected Knowledge Base error: {error}")
+    logger.error("Unexpected Knowledge Base error: %s", error)
     return (
         "An unexpected error occurred while searching the knowledge base.\n"
         f"Error: {error}"
@@ -129,10 +173,40 @@ def create_knowledge_base_tool(
         return None
     
     kb_id = config.knowledge_base_id
-    num_results = config.num_results
+    retrieval_config = {
+        "vectorSearchConfiguration": {
+            "numberOfResults": config.num_results
+        }
+    }
     retry_cfg = retry_config or KB_RETRY_CONFIG
+    # Built on the first query, then reused: constructing the retriever
+    # validates its config and creates a boto3 client
+    retriever = None
     
-    logger.info(f"Knowledge Base tool: Created (ID: {kb_id})")
+    # The retrying query runner is built once per tool, not on every call
+    @with_retry(retry_cfg)
+    def _query(query: str) -> str:
+        nonlocal retriever
+        if retriever is None:
+            retriever = _retriever_cls()(
+                knowledge_base_id=kb_id,
+                region_name=region,
+                retrieval_config=retrieval_config,
+            )
+        
+        results = retriever.invoke(query)
+        
+        if not results:
+            return "No relevant information found in the knowledge base."
+        
+        # A list comprehension rather than a generator: str.join builds a
+        # list from a generator first anyway, so this skips that step
+        return "\n".join([
+            f"Result {i}:\n{doc.page_content}\n"
+            for i, doc in enumerate(results, 1)
+        ])
+    
+    logger.info("Knowledge Base tool: Created (ID: %s)", kb_id)
     
     @tool
     def query_knowledge_base(query: str) -> str:
@@ -149,34 +223,8 @@ def create_knowledge_base_tool(
         Returns:
             Formatted results from the knowledge base
         """
-        # Lazy import to avoid requiring langchain_aws at module load time
-        from langchain_aws import AmazonKnowledgeBasesRetriever
-        
-        @with_retry(retry_cfg)
-        def _query() -> str:
-            retriever = AmazonKnowledgeBasesRetriever(
-                knowledge_base_id=kb_id,
-                region_name=region,
-                retrieval_config={
-                    "vectorSearchConfiguration": {
-                        "numberOfResults": num_results
-                    }
-                }
-            )
-            
-            results = retriever.get_relevant_documents(query)
-            
-            if not results:
-                return "No relevant information found in the knowledge base."
-            
-            formatted = []
-            for i, doc in enumerate(results, 1):
-                formatted.append(f"Result {i}:\n{doc.page_content}\n")
-            
-            return "\n".join(formatted)
-        
         try:
-            return _query()
+            return _query(query)
         except Exception as e:
             return format_kb_error(e, kb_id, region, query)
     
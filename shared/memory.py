@@ -5,14 +5,40 @@ This module provides utilities for initializing AWS Bedrock AgentCore
 Memory with proper error handling and fallback behavior.
 """
 
+import functools
 import logging
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
 
 from shared.config import MemoryConfig
 
+if TYPE_CHECKING:
+    from langgraph_checkpoint_aws import AgentCoreMemorySaver
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _memory_saver_cls() -> type["AgentCoreMemorySaver"]:
+    """
+    Return AgentCoreMemorySaver, importing langgraph_checkpoint_aws on first use.
+    
+    The import is deferred so the disabled path never loads it, and cached so
+    repeated initialize_memory() calls skip the import machinery.
+    """
+    from langgraph_checkpoint_aws import AgentCoreMemorySaver
+    return AgentCoreMemorySaver
+
+
+DEFAULT_ACTOR_ID = "default-user"
+DEFAULT_THREAD_ID = "default-session"
+
+# get_memory_config()'s default "configurable" section, copied per call
+_DEFAULT_CONFIGURABLE = {
+    "thread_id": DEFAULT_THREAD_ID,
+    "actor_id": DEFAULT_ACTOR_ID,
+}
+
+
 def initialize_memory(
     config: MemoryConfig,
     region: str,
@@ -43,33 +69,33 @@ def initialize_memory(
         return None, False
     
     try:
-        from langgraph_checkpoint_aws import AgentCoreMemorySaver
-        
-        checkpointer = AgentCoreMemorySaver(
+        checkpointer = _memory_saver_cls()(
             config.memory_id,
             region_name=region,
         )
-        logger.info(f"Memory: Successfully initialized (ID: {config.memory_id})")
+        logger.info("Memory: Successfully initialized (ID: %s)", config.memory_id)
         return checkpointer, True
     
     except ImportError as e:
         logger.warning(
-            f"Memory initialization failed: langgraph_checkpoint_aws not installed. "
-            f"Error: {e}. Agent will run in stateless mode."
+            "Memory initialization failed: langgraph_checkpoint_aws not installed. "
+            "Error: %s. Agent will run in stateless mode.",
+            e,
         )
         return None, False
     
     except Exception as e:
         logger.warning(
-            f"Memory initialization failed: {e}. "
-            f"Agent will run in stateless mode (no conversation persistence)."
+            "Memory initialization failed: %s. "
+            "Agent will run in stateless mode (no conversation persistence).",
+            e,
         )
         return None, False
 
 
 def get_memory_config(
-    actor_id: str = "default-user",
-    thread_id: str = "default-session",
+    actor_id: str = DEFAULT_ACTOR_ID,
+    thread_id: str = DEFAULT_THREAD_ID,
 ) -> dict:
     """
     Build configuration dict for memory-enabled agent calls.
@@ -81,6 +107,9 @@ def get_memory_config(
     Returns:
         Configuration dict for agent.astream() or agent.ainvoke()
     """
+    # Every call returns new dicts, since callers may add keys to them
+    if actor_id == DEFAULT_ACTOR_ID and thread_id == DEFAULT_THREAD_ID:
+        return {"configurable": _DEFAULT_CONFIGURABLE.copy()}
     return {
         "configurable": {
             "thread_id": thread_id,
@@ -7,10 +7,12 @@ operations with configurable backoff strategies.
 
 import asyncio
 import functools
+import inspect
 import logging
 import random
 from dataclasses import dataclass, field
-from typing import Callable, Optional, Set, Type, TypeVar, Union
+from time import sleep as _sleep
+from typing import Callable, FrozenSet, Optional, TypeVar
 
 from botocore.exceptions import ClientError
 
@@ -18,27 +20,63 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Jitter source for backoff delays. Jitter only spreads retries out, so a
+# plain PRNG is enough, and a bound method skips the random module's
+# global-instance indirection on every retry.
+_rng = random.Random()
+_random = _rng.random
 
-@dataclass
+# Attempts covered by RetryConfig's delay table. Any growing backoff reaches
+# max_delay well before this, so later attempts reuse the last entry.
+_DELAY_TABLE_SIZE = 32
+
+
+# AWS error codes retried by default. One shared frozenset: every default
+# RetryConfig references it, and membership checks are a hash lookup.
+DEFAULT_RETRYABLE_ERRORS: FrozenSet[str] = frozenset({
+    "ThrottlingException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "RequestTimeout",
+    "ProvisionedThroughputExceededException",
+})
+
+
+@dataclass(frozen=True, slots=True)
 class RetryConfig:
-    """Configuration for retry behavior."""
+    """
+    Configuration for retry behavior.
+    
+    Instances are immutable (use dataclasses.replace() to derive a variant),
+    so the precomputed delay table can never go stale, and slotted, so the
+    retry loop's attribute reads skip the instance __dict__.
+    """
     
     max_attempts: int = 3
     base_delay: float = 1.0
     max_delay: float = 30.0
     exponential_base: float = 2.0
     jitter: bool = True
-    retryable_errors: Set[str] = field(default_factory=lambda: {
-        "ThrottlingException",
-        "ServiceUnavailableException",
-        "InternalServerException",
-        "RequestTimeout",
-        "ProvisionedThroughputExceededException",
-    })
+    retryable_errors: FrozenSet[str] = DEFAULT_RETRYABLE_ERRORS
     retryable_exceptions: tuple = field(default_factory=lambda: (
         ConnectionError,
         TimeoutError,
     ))
+    # Jitter source; None uses the module's shared PRNG. Pass a seeded
+    # random.Random for reproducible delays (e.g. in tests).
+    rng: Optional[random.Random] = field(default=None, repr=False, compare=False)
+    # Un-jittered delay before each retry, computed once from the fields above
+    _delays: tuple = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError(
+                f"max_attempts must be at least 1, got {self.max_attempts}"
+            )
+        object.__setattr__(self, "_delays", tuple(
+            min(self.base_delay * (self.exponential_base ** attempt), self.max_delay)
+            for attempt in range(_DELAY_TABLE_SIZE)
+        ))
 
 
 def calculate_delay(
@@ -57,14 +95,12 @@ def calculate_delay(
     Returns:
         Delay in seconds before next attempt
     """
-    delay = min(
-        config.base_delay * (config.exponential_base ** attempt),
-        config.max_delay
-    )
+    delay = config._delays[min(attempt, _DELAY_TABLE_SIZE - 1)]
     
     if config.jitter:
         # Add random jitter between 0 and delay
-        delay = delay * (0.5 + random.random() * 0.5)
+        rng = config.rng
+        delay = delay * (0.5 + (_random() if rng is None else rng.random()) * 0.5)
     
     return delay
 
@@ -89,18 +125,111 @@ def is_retryable(
     
     # Check for AWS ClientError with retryable error codes
     if isinstance(error, ClientError):
-        error_code = error.response.get("Error", {}).get("Code", "")
+        # Indexing instead of chained .get(..., {}) avoids building a default
+        # dict on every call; botocore always sets both keys in practice
+        try:
+            error_code = error.response["Error"]["Code"]
+        except (KeyError, TypeError):
+            return False
         return error_code in config.retryable_errors
     
     return False
 
 
+def _retrying_sync(
+    func: Callable[..., T],
+    config: RetryConfig,
+    on_retry: Optional[Callable[[Exception, int], None]],
+) -> Callable[..., T]:
+    """Wrap a synchronous function in the retry loop."""
+    # The config is frozen, so the loop bounds are fixed at decoration time
+    max_attempts = config.max_attempts
+    last_attempt = max_attempts - 1
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> T:
+        for attempt in range(max_attempts):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e, config):
+                    logger.warning(
+                        "Non-retryable error in %s: %s", func.__name__, e
+                    )
+                    raise
+                
+                if attempt == last_attempt:
+                    logger.error(
+                        "Max retries exceeded for %s: %s", func.__name__, e
+                    )
+                    raise
+                
+                delay = calculate_delay(attempt, config)
+                logger.warning(
+                    "Retryable error in %s (attempt %d/%d): %s. Retrying in %.2fs...",
+                    func.__name__, attempt + 1, max_attempts, e, delay,
+                )
+                
+                if on_retry:
+                    on_retry(e, attempt)
+                
+                _sleep(delay)
+    
+    return wrapper
+
+
+def _retrying_async(
+    func: Callable[..., T],
+    config: RetryConfig,
+    on_retry: Optional[Callable[[Exception, int], None]],
+) -> Callable[..., T]:
+    """Wrap a coroutine function in the retry loop."""
+    # Same loop bounds as _retrying_sync
+    max_attempts = config.max_attempts
+    last_attempt = max_attempts - 1
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        for attempt in range(max_attempts):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e, config):
+                    logger.warning(
+                        "Non-retryable error in %s: %s", func.__name__, e
+                    )
+                    raise
+                
+                if attempt == last_attempt:
+                    logger.error(
+                        "Max retries exceeded for %s: %s", func.__name__, e
+                    )
+                    raise
+                
+                delay = calculate_delay(attempt, config)
+                logger.warning(
+                    "Retryable error in %s (attempt %d/%d): %s. Retrying in %.2fs...",
+                    func.__name__, attempt + 1, max_attempts, e, delay,
+                )
+                
+                if on_retry:
+                    on_retry(e, attempt)
+                
+                await asyncio.sleep(delay)
+    
+    return wrapper
+
+
 def with_retry(
     config: Optional[RetryConfig] = None,
     on_retry: Optional[Callable[[Exception, int], None]] = None,
 ) -> Callable:
     """
-    Decorator for adding retry logic to synchronous functions.
+    Decorator for adding retry logic to synchronous or async functions.
+    
+    Whether the function is a coroutine function is checked once, when it is
+    decorated, and the matching wrapper is returned; the retry loop itself
+    does no per-call dispatch.
     
     Args:
         config: Retry configuration (uses defaults if not provided)
@@ -113,67 +242,8 @@ def with_retry(
         @with_retry(RetryConfig(max_attempts=5))
         def query_knowledge_base(query: str) -> str:
             # ... implementation
-    """
-    if config is None:
-        config = RetryConfig()
-    
-    def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs) -> T:
-            last_error: Optional[Exception] = None
-            
-            for attempt in range(config.max_attempts):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    last_error = e
-                    
-                    if not is_retryable(e, config):
-                        logger.warning(
-                            f"Non-retryable error in {func.__name__}: {e}"
-                        )
-                        raise
-                    
-                    if attempt < config.max_attempts - 1:
-                        delay = calculate_delay(attempt, config)
-                        logger.warning(
-                            f"Retryable error in {func.__name__} "
-                            f"(attempt {attempt + 1}/{config.max_attempts}): {e}. "
-                            f"Retrying in {delay:.2f}s..."
-                        )
-                        
-                        if on_retry:
-                            on_retry(e, attempt)
-                        
-                        import time
-                        time.sleep(delay)
-                    else:
-                        logger.error(
-                            f"Max retries exceeded for {func.__name__}: {e}"
-                        )
-            
-            raise last_error
-        
-        return wrapper
-    return decorator
-
-
-def with_async_retry(
-    config: Optional[RetryConfig] = None,
-    on_retry: Optional[Callable[[Exception, int], None]] = None,
-) -> Callable:
-    """
-    Decorator for adding retry logic to async functions.
-    
-    Args:
-        config: Retry configuration (uses defaults if not provided)
-        on_retry: Optional callback called before each retry
         
-    Returns:
-        Decorated async function with retry logic
-        
-    Example:
-        @with_async_retry(RetryConfig(max_attempts=5))
+        @with_retry(RetryConfig(max_attempts=5))
         async def async_query(query: str) -> str:
             # ... implementation
     """
@@ -181,40 +251,12 @@ def with_async_retry(
         config = RetryConfig()
     
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs) -> T:
-            last_error: Optional[Exception] = None
-            
-            for attempt in range(config.max_attempts):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    last_error = e
-                    
-                    if not is_retryable(e, config):
-                        logger.warning(
-                            f"Non-retryable error in {func.__name__}: {e}"
-                        )
-                        raise
-                    
-                    if attempt < config.max_attempts - 1:
-                        delay = calculate_delay(attempt, config)
-                        logger.warning(
-                            f"Retryable error in {func.__name__} "
-                            f"(attempt {attempt + 1}/{config.max_attempts}): {e}. "
-                            f"Retrying in {delay:.2f}s..."
-                        )
-                        
-                        if on_retry:
-                            on_retry(e, attempt)
-                        
-                        await asyncio.sleep(delay)
-                    else:
-                        logger.error(
-                            f"Max retries exceeded for {func.__name__}: {e}"
-                        )
-            
-            raise last_error
-        
-        return wrapper
+        if inspect.iscoroutinefunction(func):
+            return _retrying_async(func, config, on_retry)
+        return _retrying_sync(func, config, on_retry)
+    
     return decorator
+
+
+# Kept for existing callers; with_retry handles async functions itself
+with_async_retry = with_retry
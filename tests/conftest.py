@@ -2,42 +2,81 @@
 Pytest configuration and shared fixtures.
 """
 
-import os
 import pytest
 from unittest.mock import MagicMock, patch
 
+from botocore.exceptions import ClientError
+
+from shared.config import load_config
+
+
+class MockDocument:
+    """Minimal stand-in for a retrieved LangChain Document."""
+    __slots__ = ("page_content",)
+    
+    def __init__(self, content: str):
+        self.page_content = content
+
+
+SAMPLE_CONTENTS = (
+    "This is the first result about AcmeCorp products.",
+    "This is the second result about pricing.",
+    "This is the third result about support.",
+)
+
+# Feature-related env vars that mock_env_vars_minimal removes
+FEATURE_ENV_VARS = (
+    "BEDROCK_GUARDRAIL_ID",
+    "BEDROCK_GUARDRAIL_VERSION",
+    "BEDROCK_KNOWLEDGE_BASE_ID",
+    "BEDROCK_MEMORY_ID",
+)
+
+
+# Environment with every feature enabled, used by mock_env_vars
+MOCK_ENV_VARS = {
+    "AWS_REGION": "us-east-1",
+    "BEDROCK_GUARDRAIL_ID": "gr-test123456",
+    "BEDROCK_GUARDRAIL_VERSION": "1",
+    "BEDROCK_KNOWLEDGE_BASE_ID": "KB-test123456",
+    "BEDROCK_MEMORY_ID": "MEM-test123456",
+}
+
 
 @pytest.fixture
-def mock_env_vars():
+def mock_env_vars(monkeypatch):
     """Fixture to set up mock environment variables."""
-    env_vars = {
-        "AWS_REGION": "us-east-1",
-        "BEDROCK_GUARDRAIL_ID": "gr-test123456",
-        "BEDROCK_GUARDRAIL_VERSION": "1",
-        "BEDROCK_KNOWLEDGE_BASE_ID": "KB-test123456",
-        "BEDROCK_MEMORY_ID": "MEM-test123456",
-    }
-    with patch.dict(os.environ, env_vars, clear=False):
-        yield env_vars
+    for name, value in MOCK_ENV_VARS.items():
+        monkeypatch.setenv(name, value)
+    return dict(MOCK_ENV_VARS)
+
+
+@pytest.fixture(scope="session")
+def full_config():
+    """
+    Fixture providing the config loaded from MOCK_ENV_VARS, built once per session.
+    
+    The environment is only patched while loading, so it does not leak into
+    other tests. Configs are frozen; use model_copy(update=...) for variants.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in MOCK_ENV_VARS.items():
+            mp.setenv(name, value)
+        return load_config()
 
 
 @pytest.fixture
-def mock_env_vars_minimal():
+def mock_env_vars_minimal(monkeypatch):
     """Fixture with minimal environment variables (no features enabled)."""
     env_vars = {
         "AWS_REGION": "us-east-1",
     }
-    # Clear feature-related env vars
-    clear_vars = [
-        "BEDROCK_GUARDRAIL_ID",
-        "BEDROCK_GUARDRAIL_VERSION", 
-        "BEDROCK_KNOWLEDGE_BASE_ID",
-        "BEDROCK_MEMORY_ID",
-    ]
-    with patch.dict(os.environ, env_vars, clear=False):
-        for var in clear_vars:
-            os.environ.pop(var, None)
-        yield env_vars
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    # monkeypatch restores removed vars on teardown, unlike popping them
+    # inside patch.dict
+    for var in FEATURE_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    return env_vars
 
 
 @pytest.fixture
@@ -50,26 +89,36 @@ def mock_bedrock_client():
 @pytest.fixture
 def mock_retriever():
     """Fixture for mocked AmazonKnowledgeBasesRetriever."""
-    with patch("langchain_aws.AmazonKnowledgeBasesRetriever") as mock:
-        yield mock
+    with patch("shared.knowledge_base._retriever_cls") as retriever_cls:
+        yield retriever_cls.return_value
 
 
 @pytest.fixture
 def mock_memory_saver():
     """Fixture for mocked AgentCoreMemorySaver."""
-    with patch("langgraph_checkpoint_aws.AgentCoreMemorySaver") as mock:
-        yield mock
+    with patch("shared.memory._memory_saver_cls") as saver_cls:
+        yield saver_cls.return_value
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_documents():
-    """Fixture providing sample document results."""
-    class MockDocument:
-        def __init__(self, content: str):
-            self.page_content = content
-    
-    return [
-        MockDocument("This is the first result about AcmeCorp products."),
-        MockDocument("This is the second result about pricing."),
-        MockDocument("This is the third result about support."),
-    ]
+    """Fixture providing sample document results (shared; do not mutate)."""
+    return [MockDocument(content) for content in SAMPLE_CONTENTS]
+
+
+# Error code -> message for the shared ClientError instances
+CLIENT_ERROR_MESSAGES = {
+    "ThrottlingException": "Rate exceeded",
+    "AccessDeniedException": "Access denied",
+    "ResourceNotFoundException": "Not found",
+    "ValidationException": "Invalid query",
+}
+
+
+@pytest.fixture(scope="module")
+def client_errors():
+    """Fixture providing one ClientError per error code, shared per module (read-only)."""
+    return {
+        code: ClientError({"Error": {"Code": code, "Message": message}}, "Retrieve")
+        for code, message in CLIENT_ERROR_MESSAGES.items()
+    }
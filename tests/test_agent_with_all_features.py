@@ -0,0 +1,81 @@
+"""
+Tests for the local all-features agent's Knowledge Base prefetch.
+"""
+
+import asyncio
+import os
+import re
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+
+# The local agents import their sibling modules by name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "local_deploy_agent"))
+
+import agent_with_all_features as agent_module
+
+
+@pytest.fixture
+def kb_agent(monkeypatch, sample_documents):
+    """The agent module with Knowledge Base and prefetch enabled and a mocked retriever."""
+    monkeypatch.setattr(agent_module, "ENABLE_KNOWLEDGE_BASE", True)
+    monkeypatch.setattr(agent_module, "KNOWLEDGE_BASE_ID", "KB-test123456")
+    monkeypatch.setattr(agent_module, "KB_PRERETRIEVE", False)
+    monkeypatch.setattr(agent_module, "KB_PREFETCH_RE", re.compile("(?i)acme"))
+    monkeypatch.setattr(agent_module, "get_client", MagicMock())
+    retriever = MagicMock()
+    retriever.ainvoke = AsyncMock()
+    monkeypatch.setattr(
+        agent_module, "AmazonKnowledgeBasesRetriever", MagicMock(return_value=retriever),
+    )
+    agent_module.get_kb_tool.cache_clear()
+    yield agent_module, retriever
+    agent_module.get_kb_tool.cache_clear()
+
+
+class TestKnowledgeBasePrefetch:
+    """Tests for the speculative Knowledge Base prefetch."""
+
+    def test_repeated_question_runs_a_new_lookup(self, kb_agent, sample_documents):
+        """A question repeated on the next turn should not replay the previous result."""
+        module, retriever = kb_agent
+        throttled = ClientError(
+            {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+            "Retrieve",
+        )
+        retriever.ainvoke.side_effect = [throttled, sample_documents, sample_documents]
+        prompt = "What does AcmeCorp sell?"
+
+        async def turn() -> str:
+            # No _end_turn(): the next turn must not depend on this one having
+            # been closed (a stream abandoned mid-way never reaches it)
+            await module._build_invocation(prompt, "user", "thread")
+            # What the agent's tool call would do during the turn
+            return await module.get_kb_tool().ainvoke(prompt)
+
+        async def session() -> list[str]:
+            # The CLI runs every turn in one task
+            return [await turn() for _ in range(3)]
+
+        results = asyncio.run(session())
+
+        assert results[0] == module.KB_THROTTLED_MESSAGE
+        assert "Result 1:" in results[1]
+        assert "Result 1:" in results[2]
+        assert retriever.ainvoke.call_count == 2  # The third turn is served from the TTL cache
+
+    def test_turn_end_restores_prefetch_variable(self, kb_agent, sample_documents):
+        """The prefetch entry should not outlive its turn."""
+        module, retriever = kb_agent
+        retriever.ainvoke.return_value = sample_documents
+
+        async def run() -> object:
+            _, _, token = await module._build_invocation("AcmeCorp?", "user", "thread")
+            assert module._kb_prefetch.get() is not None
+            await module._kb_prefetch.get()[1]
+            module._end_turn(token)
+            return module._kb_prefetch.get()
+
+        assert asyncio.run(run()) is None
@@ -0,0 +1,90 @@
+"""
+Tests for the AgentCore Runtime base agent's response streaming.
+"""
+
+import asyncio
+import importlib.util
+import os
+
+import pytest
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+# Loaded by path: local_deploy_agent also has an agent.py
+_spec = importlib.util.spec_from_file_location(
+    "aws_base_agent_agent",
+    os.path.join(os.path.dirname(__file__), "..", "aws_base_agent", "agent.py"),
+)
+agent_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(agent_module)
+
+
+class FakeAgent:
+    """Stands in for the compiled graph, replaying (chunk, metadata) events."""
+
+    def __init__(self, events, log):
+        self.events = events
+        self.log = log
+
+    async def astream(self, input_data, stream_mode):
+        for chunk, node in self.events:
+            if type(chunk) is ToolMessage:
+                self.log.append("tool result")
+            yield chunk, {"langgraph_node": node}
+
+
+class TestHandleRequestFrames:
+    """Tests for frame coalescing in handle_request."""
+
+    @pytest.fixture
+    def run(self, monkeypatch):
+        """Run handle_request over fake events, logging frames and tool results in order."""
+        # Only size and tool boundaries should cut frames in these tests
+        monkeypatch.setattr(agent_module, "STREAM_FRAME_INTERVAL", 60.0)
+
+        def run(events):
+            log = []
+            monkeypatch.setattr(agent_module, "agent", FakeAgent(events, log))
+
+            async def consume():
+                async for frame in agent_module.handle_request({"prompt": "Weather?"}):
+                    log.append(frame)
+
+            asyncio.run(consume())
+            return log
+
+        return run
+
+    def test_text_before_tool_call_is_sent_before_tool_result(self, run):
+        """Text streamed before a tool call should not wait for the tool to finish."""
+        log = run([
+            (AIMessageChunk(content="Let me check."), "agent"),
+            (AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "get_weather", "args": "", "id": "call-1", "index": 0},
+            ]), "agent"),
+            (ToolMessage(content="Sunny", tool_call_id="call-1"), "tools"),
+            (AIMessageChunk(content="It is sunny."), "agent"),
+        ])
+
+        assert log == ["Let me check.", "tool result", "It is sunny."]
+
+    def test_text_flushed_when_another_node_emits(self, run):
+        """Pending text should be sent on another node's event, not merged with later text."""
+        log = run([
+            (AIMessageChunk(content="Looking that up."), "agent"),
+            (ToolMessage(content="Sunny", tool_call_id="call-1"), "tools"),
+            (AIMessageChunk(content="Done."), "agent"),
+        ])
+
+        assert [entry for entry in log if entry != "tool result"] == [
+            "Looking that up.", "Done.",
+        ]
+
+    def test_small_deltas_are_coalesced(self, run):
+        """Consecutive text deltas should go out together as one frame."""
+        log = run([
+            (AIMessageChunk(content="Hel"), "agent"),
+            (AIMessageChunk(content="lo"), "agent"),
+            (AIMessageChunk(content=""), "agent"),
+        ])
+
+        assert log == ["Hello"]
@@ -0,0 +1,132 @@
+"""
+Tests for the local agents' AgentCore Memory checkpointer extensions.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.base import CheckpointTuple, empty_checkpoint
+from langgraph_checkpoint_aws import AgentCoreMemorySaver
+
+# The local agents import their sibling modules by name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "local_deploy_agent"))
+
+import checkpointers
+from checkpointers import CachingMemorySaver
+
+CONFIG = {"configurable": {"thread_id": "thread-1", "actor_id": "user-1"}}
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    """AgentCoreMemorySaver's Memory calls, replaced with mocks."""
+    memory = MagicMock()
+    memory.put.side_effect = lambda config, checkpoint, metadata, new_versions: {
+        "configurable": {**config["configurable"], "checkpoint_ns": "", "checkpoint_id": checkpoint["id"]},
+    }
+    memory.get_tuple.return_value = None
+    for name in ("put", "put_writes", "delete_thread", "get_tuple"):
+        monkeypatch.setattr(AgentCoreMemorySaver, name, lambda self, *args, _name=name: getattr(memory, _name)(*args))
+    return memory
+
+
+@pytest.fixture
+def saver(memory):
+    return CachingMemorySaver("mem-test123456", region_name="us-east-1")
+
+
+def save(saver, text="Hello"):
+    """Save a checkpoint holding one message, as LangGraph would, and return it."""
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": [HumanMessage(content=text)]}
+    checkpoint["channel_versions"] = {"messages": 1}
+    asyncio.run(saver.aput(CONFIG, checkpoint, {"step": 1}, {"messages": 1}))
+    return checkpoint
+
+
+class TestCachingMemorySaver:
+    """Tests for CachingMemorySaver."""
+
+    def test_read_after_put_is_served_from_cache(self, saver, memory):
+        """The checkpoint just saved should be returned without reading Memory."""
+        checkpoint = save(saver)
+
+        result = asyncio.run(saver.aget_tuple(CONFIG))
+
+        memory.get_tuple.assert_not_called()
+        assert result.checkpoint["id"] == checkpoint["id"]
+        assert result.checkpoint["channel_values"]["messages"][0].content == "Hello"
+        assert result.metadata["step"] == 1
+
+    def test_cached_checkpoint_is_a_copy(self, saver, memory):
+        """Changes to the saved checkpoint or to a returned one should not reach the cache."""
+        checkpoint = save(saver)
+        checkpoint["channel_values"]["messages"].append(HumanMessage(content="later"))
+        asyncio.run(saver.aget_tuple(CONFIG)).checkpoint["channel_values"]["messages"].clear()
+
+        result = asyncio.run(saver.aget_tuple(CONFIG))
+
+        assert [m.content for m in result.checkpoint["channel_values"]["messages"]] == ["Hello"]
+
+    def test_read_is_cached(self, saver, memory):
+        """A checkpoint read from Memory should serve the next read."""
+        memory.get_tuple.return_value = CheckpointTuple(
+            config=CONFIG, checkpoint=empty_checkpoint(), metadata={}, parent_config=None,
+            pending_writes=[("task-1", "messages", "Hi")],
+        )
+
+        first = asyncio.run(saver.aget_tuple(CONFIG))
+        second = asyncio.run(saver.aget_tuple(CONFIG))
+
+        assert memory.get_tuple.call_count == 1
+        assert second.pending_writes == first.pending_writes == [("task-1", "messages", "Hi")]
+
+    def test_missing_checkpoint_is_not_cached(self, saver, memory):
+        """A thread without a checkpoint should be read from Memory every time."""
+        asyncio.run(saver.aget_tuple(CONFIG))
+        asyncio.run(saver.aget_tuple(CONFIG))
+
+        assert memory.get_tuple.call_count == 2
+
+    def test_put_writes_invalidates(self, saver, memory):
+        """Pending writes should drop the cached checkpoint."""
+        checkpoint = save(saver)
+        config = {"configurable": {**CONFIG["configurable"], "checkpoint_id": checkpoint["id"]}}
+
+        asyncio.run(saver.aput_writes(config, [("messages", "Hi")], "task-1"))
+        asyncio.run(saver.aget_tuple(CONFIG))
+
+        memory.get_tuple.assert_called_once()
+
+    def test_delete_thread_invalidates(self, saver, memory):
+        """Deleting the thread should drop its cached checkpoint."""
+        save(saver)
+
+        asyncio.run(saver.adelete_thread("thread-1", "user-1"))
+        asyncio.run(saver.aget_tuple(CONFIG))
+
+        memory.get_tuple.assert_called_once()
+
+    def test_sync_writes_invalidate(self, saver, memory):
+        """Writes through the sync API should drop the cached checkpoint too."""
+        save(saver)
+
+        saver.put(CONFIG, empty_checkpoint(), {}, {})
+        asyncio.run(saver.aget_tuple(CONFIG))
+
+        memory.get_tuple.assert_called_once()
+
+    def test_entry_expires_after_ttl(self, saver, memory, monkeypatch):
+        """An entry older than cache_ttl should be read from Memory again."""
+        now = 1000.0
+        monkeypatch.setattr(checkpointers.time, "monotonic", lambda: now)
+        save(saver)
+
+        now += saver.cache_ttl
+        asyncio.run(saver.aget_tuple(CONFIG))
+
+        memory.get_tuple.assert_called_once()
@@ -2,9 +2,9 @@
 Tests for configuration management.
 """
 
-import os
+import re
+
 import pytest
-from unittest.mock import patch
 
 from shared.config import (
     AgentConfig,
@@ -14,6 +14,11 @@ from shared.config import (
     load_config,
 )
 
+# Expected validation errors, compiled once for the pytest.raises matches
+INVALID_GUARDRAIL_ID = re.compile("Invalid GuardRail ID format")
+INVALID_KB_ID = re.compile("Invalid Knowledge Base ID format")
+INVALID_MEMORY_ID = re.compile("Invalid Memory ID format")
+
 
 class TestGuardRailsConfig:
     """Tests for GuardRailsConfig."""
@@ -52,9 +57,20 @@ class TestGuardRailsConfig:
     
     def test_invalid_id_format_raises_error(self):
         """Short ID should raise validation error."""
-        with pytest.raises(ValueError, match="Invalid GuardRail ID format"):
+        with pytest.raises(ValueError, match=INVALID_GUARDRAIL_ID):
             GuardRailsConfig(guardrail_id="gr", guardrail_version="1")
     
+    def test_id_with_inner_whitespace_raises_error(self):
+        """IDs containing whitespace should raise validation error."""
+        with pytest.raises(ValueError, match=INVALID_GUARDRAIL_ID):
+            GuardRailsConfig(guardrail_id="gr-test 123456", guardrail_version="1")
+    
+    def test_id_is_interned(self):
+        """Stripped IDs should be interned so equal IDs share one object."""
+        first = GuardRailsConfig(guardrail_id=" gr-" + "test123456 ")
+        second = GuardRailsConfig(guardrail_id="gr-test123456")
+        assert first.guardrail_id is second.guardrail_id
+    
     def test_missing_version_raises_error(self):
         """Missing version when ID is set should raise error."""
         with pytest.raises(ValueError, match="version is required"):
@@ -89,7 +105,7 @@ class TestKnowledgeBaseConfig:
     
     def test_invalid_id_format_raises_error(self):
         """Short ID should raise validation error."""
-        with pytest.raises(ValueError, match="Invalid Knowledge Base ID format"):
+        with pytest.raises(ValueError, match=INVALID_KB_ID):
             KnowledgeBaseConfig(knowledge_base_id="KB")
 
 
@@ -108,7 +124,7 @@ class TestMemoryConfig:
     
     def test_invalid_id_format_raises_error(self):
         """Short ID should raise validation error."""
-        with pytest.raises(ValueError, match="Invalid Memory ID format"):
+        with pytest.raises(ValueError, match=INVALID_MEMORY_ID):
             MemoryConfig(memory_id="MEM")
 
 
@@ -124,6 +140,20 @@ class TestAgentConfig:
         assert not config.knowledge_base.enabled
         assert not config.memory.enabled
     
+    def test_is_frozen_and_hashable(self):
+        """Configs should be immutable and usable as cache keys."""
+        from pydantic import ValidationError
+        config = AgentConfig(
+            guardrails=GuardRailsConfig(guardrail_id="gr-test123456"),
+        )
+        with pytest.raises(ValidationError):
+            config.region = "us-west-2"
+        same = AgentConfig(
+            guardrails=GuardRailsConfig(guardrail_id="gr-test123456"),
+        )
+        assert hash(config) == hash(same)
+        assert {config: "cached"}[same] == "cached"
+    
     def test_all_features_enabled(self):
         """All features should be configurable."""
         config = AgentConfig(
@@ -148,9 +178,9 @@ class TestAgentConfig:
 class TestLoadConfig:
     """Tests for load_config function."""
     
-    def test_load_from_env_vars(self, mock_env_vars):
+    def test_load_from_env_vars(self, full_config):
         """Configuration should load from environment variables."""
-        config = load_config()
+        config = full_config
         assert config.region == "us-east-1"
         assert config.guardrails.enabled
         assert config.guardrails.guardrail_id == "gr-test123456"
@@ -173,3 +203,47 @@ class TestLoadConfig:
         )
         assert config.region == "eu-west-1"
         assert config.system_prompt == "Custom prompt"
+    
+    def test_model_copy_overrides_loaded_config(self, full_config):
+        """Frozen configs should still allow copies with overridden fields."""
+        config = full_config.model_copy(
+            update={"region": "eu-west-1", "system_prompt": "Custom prompt"},
+        )
+        assert config.region == "eu-west-1"
+        assert config.system_prompt == "Custom prompt"
+        assert config.guardrails is full_config.guardrails
+        assert full_config.region == "us-east-1"
+    
+    def test_repeated_calls_return_cached_config(self, mock_env_vars):
+        """Repeated calls with an unchanged environment should reuse the config."""
+        assert load_config() is load_config()
+    
+    def test_env_change_returns_new_config(self, mock_env_vars, monkeypatch):
+        """Changing a relevant environment variable should yield a new config."""
+        first = load_config()
+        monkeypatch.setenv("BEDROCK_MEMORY_ID", "MEM-other123456")
+        second = load_config()
+        assert second is not first
+        assert second.memory.memory_id == "MEM-other123456"
+        assert first.memory.memory_id == "MEM-test123456"
+    
+    def test_cache_clear(self, mock_env_vars):
+        """cache_clear should force the next call to rebuild the config."""
+        first = load_config()
+        load_config.cache_clear()
+        assert load_config() is not first
+    
+    def test_unvalidated_config_matches_validated(self, mock_env_vars, monkeypatch):
+        """validate=False should build the same configuration without validators."""
+        monkeypatch.setenv("BEDROCK_MEMORY_ID", "  MEM-test123456  ")
+        validated = load_config()
+        constructed = load_config(validate=False)
+        assert constructed == validated
+        assert constructed.memory.memory_id == "MEM-test123456"
+    
+    def test_unvalidated_config_maps_blank_ids_to_none(self, mock_env_vars_minimal, monkeypatch):
+        """validate=False should still treat blank IDs as disabled features."""
+        monkeypatch.setenv("BEDROCK_GUARDRAIL_ID", "   ")
+        config = load_config(validate=False)
+        assert not config.guardrails.enabled
+        assert not config.knowledge_base.enabled
@@ -2,6 +2,8 @@
 Tests for GuardRails configuration and error handling.
 """
 
+import sys
+
 import pytest
 
 from shared.config import GuardRailsConfig
@@ -14,6 +16,21 @@ from shared.guardrails import (
 )
 
 
+# One exception per message, built once and shared by the parametrized cases
+GUARDRAILS_ERRORS = {
+    message: Exception(message)
+    for message in (
+        "GuardRail intervention blocked the request",
+        "Content intervention occurred",
+        "Request was blocked due to policy",
+        "Violated content policy",
+        "GUARDRAIL INTERVENTION",
+        "Connection timeout",
+        "",
+    )
+}
+
+
 class TestBuildGuardrailsConfig:
     """Tests for build_guardrails_config function."""
     
@@ -45,45 +62,49 @@ class TestBuildGuardrailsConfig:
         result = build_guardrails_config(config)
         
         assert result["guardrailVersion"] == "DRAFT"
+    
+    def test_result_is_cached_per_config(self):
+        """Configs with the same ID and version should share one mapping."""
+        first = build_guardrails_config(GuardRailsConfig(guardrail_id="gr-test123456"))
+        second = build_guardrails_config(GuardRailsConfig(guardrail_id="gr-test123456"))
+        
+        assert first is second
+    
+    def test_result_is_read_only(self):
+        """The shared mapping should not be modifiable by callers."""
+        result = build_guardrails_config(GuardRailsConfig(guardrail_id="gr-test123456"))
+        
+        with pytest.raises(TypeError):
+            result["trace"] = "disabled"
+        assert dict(result)["trace"] == "enabled"
 
 
 class TestIsGuardrailsError:
     """Tests for is_guardrails_error function."""
     
-    def test_detects_guardrail_keyword(self):
-        """Should detect 'guardrail' keyword."""
-        error = Exception("GuardRail intervention blocked the request")
-        assert is_guardrails_error(error) is True
-    
-    def test_detects_intervention_keyword(self):
-        """Should detect 'intervention' keyword."""
-        error = Exception("Content intervention occurred")
-        assert is_guardrails_error(error) is True
-    
-    def test_detects_blocked_keyword(self):
-        """Should detect 'blocked' keyword."""
-        error = Exception("Request was blocked due to policy")
-        assert is_guardrails_error(error) is True
-    
-    def test_detects_content_policy_keyword(self):
-        """Should detect 'content policy' keyword."""
-        error = Exception("Violated content policy")
-        assert is_guardrails_error(error) is True
+    @pytest.mark.parametrize("message, expected", [
+        ("GuardRail intervention blocked the request", True),  # 'guardrail' keyword
+        ("Content intervention occurred", True),  # 'intervention' keyword
+        ("Request was blocked due to policy", True),  # 'blocked' keyword
+        ("Violated content policy", True),  # 'content policy' keyword
+        ("GUARDRAIL INTERVENTION", True),  # case insensitive
+        ("Connection timeout", False),  # non-GuardRails error
+        ("", False),  # empty message
+    ])
+    def test_detects_keywords(self, message, expected):
+        """Should detect GuardRails keywords, case-insensitively, and nothing else."""
+        assert is_guardrails_error(GUARDRAILS_ERRORS[message]) is expected
     
-    def test_case_insensitive(self):
-        """Should be case insensitive."""
-        error = Exception("GUARDRAIL INTERVENTION")
+    def test_detects_keyword_split_across_whitespace(self):
+        """Should match multi-word keywords separated by any whitespace."""
+        error = Exception("Response violates the content\n  policy")
         assert is_guardrails_error(error) is True
     
-    def test_returns_false_for_other_errors(self):
-        """Should return False for non-GuardRails errors."""
-        error = Exception("Connection timeout")
-        assert is_guardrails_error(error) is False
-    
-    def test_returns_false_for_empty_message(self):
-        """Should return False for empty error message."""
-        error = Exception("")
-        assert is_guardrails_error(error) is False
+    def test_scans_long_messages(self):
+        """Should scan a large error message in one pass, wherever the keyword is."""
+        filler = "x" * 10_000
+        assert is_guardrails_error(Exception(filler)) is False
+        assert is_guardrails_error(Exception(filler + " BLOCKED")) is True
 
 
 class TestHandleGuardrailsError:
@@ -125,6 +146,12 @@ class TestGetGuardrailsInterventionMessage:
         result = get_guardrails_intervention_message()
         assert result == GUARDRAILS_INTERVENTION_MESSAGE
     
+    def test_message_is_interned(self):
+        """The message should be the interned, shared string object."""
+        assert get_guardrails_intervention_message() is GUARDRAILS_INTERVENTION_MESSAGE
+        rebuilt = "".join(list(GUARDRAILS_INTERVENTION_MESSAGE))
+        assert sys.intern(rebuilt) is GUARDRAILS_INTERVENTION_MESSAGE
+    
     def test_message_is_user_friendly(self):
         """Message should be user-friendly."""
         result = get_guardrails_intervention_message()
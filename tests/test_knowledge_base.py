@@ -5,14 +5,13 @@ Tests for Knowledge Base tool creation.
 import pytest
 from unittest.mock import MagicMock, patch
 
-from botocore.exceptions import ClientError
-
 from shared.config import KnowledgeBaseConfig
 
 
 # Import format_kb_error directly since it doesn't require langchain_aws
-def get_format_kb_error():
-    """Lazy import of format_kb_error."""
+@pytest.fixture(scope="module")
+def format_kb_error():
+    """Lazy import of format_kb_error, once per module."""
     from shared.knowledge_base import format_kb_error
     return format_kb_error
 
@@ -20,57 +19,21 @@ def get_format_kb_error():
 class TestFormatKbError:
     """Tests for format_kb_error function."""
     
-    def test_resource_not_found_error(self):
-        """ResourceNotFoundException should return helpful message."""
-        format_kb_error = get_format_kb_error()
-        error = ClientError(
-            {"Error": {"Code": "ResourceNotFoundException", "Message": "Not found"}},
-            "Retrieve",
-        )
-        result = format_kb_error(error, "KB-123", "us-east-1", "test query")
-        
-        assert "Knowledge Base not found" in result
-        assert "KB-123" in result
-        assert "us-east-1" in result
-    
-    def test_validation_exception(self):
-        """ValidationException should return helpful message."""
-        format_kb_error = get_format_kb_error()
-        error = ClientError(
-            {"Error": {"Code": "ValidationException", "Message": "Invalid query"}},
-            "Retrieve",
-        )
-        result = format_kb_error(error, "KB-123", "us-east-1", "test query")
-        
-        assert "Invalid query format" in result
-    
-    def test_access_denied_exception(self):
-        """AccessDeniedException should return helpful message."""
-        format_kb_error = get_format_kb_error()
-        error = ClientError(
-            {"Error": {"Code": "AccessDeniedException", "Message": "Access denied"}},
-            "Retrieve",
-        )
-        result = format_kb_error(error, "KB-123", "us-east-1", "test query")
-        
-        assert "Access denied" in result
-        assert "IAM permissions" in result
-    
-    def test_throttling_exception(self):
-        """ThrottlingException should return helpful message."""
-        format_kb_error = get_format_kb_error()
-        error = ClientError(
-            {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
-            "Retrieve",
-        )
-        result = format_kb_error(error, "KB-123", "us-east-1", "test query")
+    @pytest.mark.parametrize("code, expected", [
+        ("ResourceNotFoundException", ("Knowledge Base not found", "KB-123", "us-east-1")),
+        ("ValidationException", ("Invalid query format",)),
+        ("AccessDeniedException", ("Access denied", "IAM permissions")),
+        ("ThrottlingException", ("throttled", "rate limits")),
+    ])
+    def test_client_error_messages(self, format_kb_error, client_errors, code, expected):
+        """Known AWS error codes should return helpful messages."""
+        result = format_kb_error(client_errors[code], "KB-123", "us-east-1", "test query")
         
-        assert "throttled" in result
-        assert "rate limits" in result
+        for text in expected:
+            assert text in result
     
-    def test_generic_exception(self):
+    def test_generic_exception(self, format_kb_error):
         """Generic exceptions should return error message."""
-        format_kb_error = get_format_kb_error()
         error = ValueError("Something went wrong")
         result = format_kb_error(error, "KB-123", "us-east-1", "test query")
         
@@ -78,39 +41,61 @@ class TestFormatKbError:
         assert "Something went wrong" in result
 
 
+@pytest.fixture(scope="module")
+def create_knowledge_base_tool():
+    """Lazy import of create_knowledge_base_tool, once per module."""
+    from shared.knowledge_base import create_knowledge_base_tool
+    return create_knowledge_base_tool
+
+
 class TestCreateKnowledgeBaseTool:
     """Tests for create_knowledge_base_tool function."""
     
-    def test_returns_none_when_disabled(self):
+    def test_returns_none_when_disabled(self, create_knowledge_base_tool):
         """Should return None when Knowledge Base is disabled."""
-        from shared.knowledge_base import create_knowledge_base_tool
         config = KnowledgeBaseConfig()
         tool = create_knowledge_base_tool(config, "us-east-1")
         assert tool is None
     
-    @patch("shared.knowledge_base.AmazonKnowledgeBasesRetriever", create=True)
-    def test_returns_tool_when_enabled(self, mock_retriever_class):
+    @patch("shared.knowledge_base._retriever_cls")
+    def test_returns_tool_when_enabled(self, mock_retriever_cls, create_knowledge_base_tool):
         """Should return tool function when Knowledge Base is enabled."""
-        from shared.knowledge_base import create_knowledge_base_tool
         config = KnowledgeBaseConfig(knowledge_base_id="KB-test123456")
         tool = create_knowledge_base_tool(config, "us-east-1")
         assert tool is not None
         # LangChain tools are StructuredTool objects with an invoke method
         assert hasattr(tool, 'invoke') or callable(tool)
     
-    @patch("shared.knowledge_base.AmazonKnowledgeBasesRetriever", create=True)
-    def test_tool_has_correct_name(self, mock_retriever_class):
+    @patch("shared.knowledge_base._retriever_cls")
+    def test_tool_has_correct_name(self, mock_retriever_cls, create_knowledge_base_tool):
         """Tool should have correct name."""
-        from shared.knowledge_base import create_knowledge_base_tool
         config = KnowledgeBaseConfig(knowledge_base_id="KB-test123456")
         tool = create_knowledge_base_tool(config, "us-east-1")
         assert tool.name == "query_knowledge_base"
     
-    @patch("shared.knowledge_base.AmazonKnowledgeBasesRetriever", create=True)
-    def test_tool_has_description(self, mock_retriever_class):
+    @patch("shared.knowledge_base._retriever_cls")
+    def test_tool_has_description(self, mock_retriever_cls, create_knowledge_base_tool):
         """Tool should have a description."""
-        from shared.knowledge_base import create_knowledge_base_tool
         config = KnowledgeBaseConfig(knowledge_base_id="KB-test123456")
         tool = create_knowledge_base_tool(config, "us-east-1")
         assert tool.description is not None
         assert len(tool.description) > 0
+    
+    @patch("shared.knowledge_base._retriever_cls")
+    def test_retriever_built_once_per_tool(self, mock_retriever_cls, sample_documents, create_knowledge_base_tool):
+        """The retriever should be built on the first query and reused after."""
+        mock_retriever_class = mock_retriever_cls.return_value
+        mock_retriever_class.return_value.invoke.return_value = sample_documents
+        config = KnowledgeBaseConfig(knowledge_base_id="KB-test123456", num_results=3)
+        tool = create_knowledge_base_tool(config, "us-east-1")
+        
+        first = tool.invoke({"query": "products"})
+        second = tool.invoke({"query": "pricing"})
+        
+        assert "Result 1:" in first and "Result 3:" in second
+        mock_retriever_class.assert_called_once_with(
+            knowledge_base_id="KB-test123456",
+            region_name="us-east-1",
+            retrieval_config={"vectorSearchConfiguration": {"numberOfResults": 3}},
+        )
+        assert mock_retriever_class.return_value.invoke.call_count == 2
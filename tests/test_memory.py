@@ -3,27 +3,32 @@ Tests for Memory initialization.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 from shared.config import MemoryConfig
 from shared.memory import get_memory_config
 
 
+@pytest.fixture(scope="module")
+def initialize_memory():
+    """Lazy import of initialize_memory, once per module."""
+    from shared.memory import initialize_memory
+    return initialize_memory
+
+
 class TestInitializeMemory:
     """Tests for initialize_memory function."""
     
-    def test_returns_none_when_disabled(self):
+    def test_returns_none_when_disabled(self, initialize_memory):
         """Should return (None, False) when Memory is disabled."""
-        from shared.memory import initialize_memory
         config = MemoryConfig()
         checkpointer, success = initialize_memory(config, "us-east-1")
         
         assert checkpointer is None
         assert success is False
     
-    def test_returns_checkpointer_when_enabled(self, mock_memory_saver):
+    def test_returns_checkpointer_when_enabled(self, mock_memory_saver, initialize_memory):
         """Should return checkpointer when Memory is enabled."""
-        from shared.memory import initialize_memory
         mock_saver = MagicMock()
         mock_memory_saver.return_value = mock_saver
         
@@ -37,11 +42,9 @@ class TestInitializeMemory:
             region_name="us-east-1",
         )
     
-    @patch("langgraph_checkpoint_aws.AgentCoreMemorySaver")
-    def test_handles_initialization_error(self, mock_saver_class):
+    def test_handles_initialization_error(self, mock_memory_saver, initialize_memory):
         """Should handle initialization errors gracefully."""
-        from shared.memory import initialize_memory
-        mock_saver_class.side_effect = Exception("Connection failed")
+        mock_memory_saver.side_effect = Exception("Connection failed")
         
         config = MemoryConfig(memory_id="MEM-test123456")
         checkpointer, success = initialize_memory(config, "us-east-1")
@@ -89,3 +92,10 @@ class TestGetMemoryConfig:
         assert "configurable" in config
         assert "actor_id" in config["configurable"]
         assert "thread_id" in config["configurable"]
+    
+    def test_default_configs_are_independent(self):
+        """Default configs should be separate dicts, safe to modify."""
+        first = get_memory_config()
+        first["configurable"]["checkpoint_ns"] = "ns"
+        
+        assert "checkpoint_ns" not in get_memory_config()["configurable"]
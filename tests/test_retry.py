@@ -3,12 +3,10 @@ Tests for retry logic.
 """
 
 import pytest
-import time
-from unittest.mock import MagicMock, patch
-
-from botocore.exceptions import ClientError
+import random
 
 from shared.retry import (
+    DEFAULT_RETRYABLE_ERRORS,
     RetryConfig,
     calculate_delay,
     is_retryable,
@@ -16,6 +14,14 @@ from shared.retry import (
 )
 
 
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Replace the retry loop's sleep with a recorder, so backoff costs no wall time."""
+    delays = []
+    monkeypatch.setattr("shared.retry._sleep", delays.append)
+    return delays
+
+
 class TestRetryConfig:
     """Tests for RetryConfig."""
     
@@ -27,6 +33,25 @@ class TestRetryConfig:
         assert config.max_delay == 30.0
         assert config.jitter is True
         assert "ThrottlingException" in config.retryable_errors
+    
+    def test_default_retryable_errors_are_shared(self):
+        """Default configs should share the module-level frozenset."""
+        assert RetryConfig().retryable_errors is DEFAULT_RETRYABLE_ERRORS
+        assert isinstance(DEFAULT_RETRYABLE_ERRORS, frozenset)
+    
+    def test_is_immutable(self):
+        """Fields should not be reassignable after construction."""
+        import dataclasses
+        config = RetryConfig()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.max_attempts = 5
+        assert dataclasses.replace(config, max_attempts=5).max_attempts == 5
+    
+    @pytest.mark.parametrize("max_attempts", [0, -1])
+    def test_rejects_fewer_than_one_attempt(self, max_attempts):
+        """max_attempts below 1 should raise ValueError."""
+        with pytest.raises(ValueError, match="max_attempts"):
+            RetryConfig(max_attempts=max_attempts)
 
 
 class TestCalculateDelay:
@@ -47,53 +72,66 @@ class TestCalculateDelay:
         
         assert calculate_delay(10, config) == 5.0
     
+    def test_precomputed_delays_match_formula(self):
+        """Delays should follow the capped exponential formula."""
+        config = RetryConfig(
+            jitter=False, max_attempts=5, base_delay=0.5, max_delay=3.0,
+        )
+        
+        assert [calculate_delay(a, config) for a in range(6)] == [
+            0.5, 1.0, 2.0, 3.0, 3.0, 3.0,
+        ]
+    
+    def test_attempts_past_table_use_max_delay(self):
+        """Very late attempts should stay capped at max_delay."""
+        config = RetryConfig(jitter=False, base_delay=1.0, max_delay=30.0)
+        
+        assert calculate_delay(100, config) == 30.0
+    
     def test_jitter_adds_randomness(self):
         """Jitter should add randomness to delay."""
-        config = RetryConfig(jitter=True, base_delay=1.0)
+        config = RetryConfig(jitter=True, base_delay=1.0, rng=random.Random(0))
         
         # Run multiple times and check for variation
         delays = [calculate_delay(0, config) for _ in range(10)]
-        assert len(set(delays)) > 1  # Should have variation
+        assert len(set(delays)) == 10  # Should have variation
+        assert all(0.5 <= d <= 1.0 for d in delays)
+    
+    def test_seeded_rng_is_reproducible(self):
+        """Configs with equally seeded RNGs should produce the same delays."""
+        first = RetryConfig(rng=random.Random(42))
+        second = RetryConfig(rng=random.Random(42))
+        
+        assert [calculate_delay(a, first) for a in range(3)] == [
+            calculate_delay(a, second) for a in range(3)
+        ]
+
+
+@pytest.fixture(scope="module")
+def retry_config():
+    """Default RetryConfig, shared by the module's read-only tests."""
+    return RetryConfig()
 
 
 class TestIsRetryable:
     """Tests for is_retryable function."""
     
-    def test_throttling_exception_is_retryable(self):
-        """ThrottlingException should be retryable."""
-        config = RetryConfig()
-        error = ClientError(
-            {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
-            "TestOperation",
-        )
-        assert is_retryable(error, config) is True
-    
-    def test_access_denied_not_retryable(self):
-        """AccessDeniedException should not be retryable."""
-        config = RetryConfig()
-        error = ClientError(
-            {"Error": {"Code": "AccessDeniedException", "Message": "Access denied"}},
-            "TestOperation",
-        )
-        assert is_retryable(error, config) is False
-    
-    def test_connection_error_is_retryable(self):
-        """ConnectionError should be retryable."""
-        config = RetryConfig()
-        error = ConnectionError("Connection failed")
-        assert is_retryable(error, config) is True
-    
-    def test_timeout_error_is_retryable(self):
-        """TimeoutError should be retryable."""
-        config = RetryConfig()
-        error = TimeoutError("Request timed out")
-        assert is_retryable(error, config) is True
+    @pytest.mark.parametrize("code, expected", [
+        ("ThrottlingException", True),
+        ("AccessDeniedException", False),
+    ])
+    def test_client_error_codes(self, retry_config, client_errors, code, expected):
+        """Only retryable AWS error codes should be retried."""
+        assert is_retryable(client_errors[code], retry_config) is expected
     
-    def test_value_error_not_retryable(self):
-        """ValueError should not be retryable."""
-        config = RetryConfig()
-        error = ValueError("Invalid value")
-        assert is_retryable(error, config) is False
+    @pytest.mark.parametrize("error, expected", [
+        (ConnectionError("Connection failed"), True),
+        (TimeoutError("Request timed out"), True),
+        (ValueError("Invalid value"), False),
+    ])
+    def test_exception_types(self, retry_config, error, expected):
+        """Connection and timeout errors should be retried; others should not."""
+        assert is_retryable(error, retry_config) is expected
 
 
 class TestWithRetry:
@@ -144,7 +182,7 @@ class TestWithRetry:
         
         assert call_count == 1
     
-    def test_max_retries_exceeded(self):
+    def test_max_retries_exceeded(self, no_sleep):
         """Function should raise after max retries."""
         call_count = 0
         
@@ -158,6 +196,7 @@ class TestWithRetry:
             always_fails()
         
         assert call_count == 3
+        assert len(no_sleep) == 2  # Backoff before each retry, none after the last
     
     def test_on_retry_callback(self):
         """on_retry callback should be called before each retry."""
@@ -181,3 +220,49 @@ class TestWithRetry:
         assert len(retry_calls) == 2
         assert retry_calls[0][1] == 0  # First retry attempt
         assert retry_calls[1][1] == 1  # Second retry attempt
+
+
+class TestWithRetryAsync:
+    """Tests for with_retry applied to async functions."""
+    
+    def test_returns_coroutine_function(self):
+        """Decorating an async function should keep it awaitable."""
+        import inspect
+        
+        @with_retry(RetryConfig(max_attempts=3))
+        async def async_func():
+            return "success"
+        
+        assert inspect.iscoroutinefunction(async_func)
+    
+    def test_retries_async_function(self):
+        """Async functions should be retried on retryable errors."""
+        import asyncio
+        call_count = 0
+        
+        @with_retry(RetryConfig(max_attempts=3, base_delay=0.01))
+        async def flaky_func():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise ConnectionError("Connection failed")
+            return "success"
+        
+        assert asyncio.run(flaky_func()) == "success"
+        assert call_count == 3
+    
+    def test_async_no_retry_on_non_retryable_error(self):
+        """Async functions should not retry on non-retryable errors."""
+        import asyncio
+        call_count = 0
+        
+        @with_retry(RetryConfig(max_attempts=3))
+        async def failing_func():
+            nonlocal call_count
+            call_count += 1
+            raise ValueError("Invalid value")
+        
+        with pytest.raises(ValueError):
+            asyncio.run(failing_func())
+        
+        assert call_count == 1